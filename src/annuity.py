@@ -0,0 +1,56 @@
+import numpy as np
+
+# Anualidad discreta (Valor Futuro) vectorizada.
+# Todas las funciones aceptan escalares o arrays de NumPy para el aporte
+# mensual P, la tasa anual r_annual (decimal) y el plazo n_months; los
+# argumentos se combinan con las reglas de broadcasting de NumPy.
+
+
+def growth_factor(r_monthly, n):
+    """((1 + r)^n - 1) / r, que tiende a n cuando r -> 0.
+
+    Es el valor futuro de n aportes unitarios a la tasa r por período;
+    también lo usa loans para cuotas y saldos.
+    """
+    # expm1/log1p keep the precision for small rates and np.where handles
+    # r = 0 without per-element branches
+    zero = r_monthly == 0
+    safe_r = np.where(zero, 1.0, r_monthly)
+    factor = np.expm1(n * np.log1p(r_monthly)) / safe_r
+    return np.where(zero, n, factor)
+
+
+def future_value(P, r_annual, n_months):
+    """Valor futuro de una anualidad con aportes al final de cada mes."""
+    P = np.asarray(P, dtype=float)
+    r_monthly = np.asarray(r_annual, dtype=float) / 12
+    n = np.asarray(n_months, dtype=float)
+    return P * growth_factor(r_monthly, n)
+
+
+def trajectory(P, r_annual, n_months):
+    """Saldo mes a mes, de 0 a max(n_months).
+
+    Devuelve (months, values) donde values tiene forma
+    broadcast(P, r_annual, n_months).shape + (max(n_months) + 1,).
+    Después de su plazo, cada hogar conserva su valor final.
+    """
+    P, r_annual, n_months = np.broadcast_arrays(
+        np.asarray(P, dtype=float),
+        np.asarray(r_annual, dtype=float),
+        np.asarray(n_months, dtype=int),
+    )
+    horizon = int(n_months.max()) if n_months.size else 0
+    months = np.arange(horizon + 1)
+    k = np.minimum(months, n_months[..., None])
+    values = P[..., None] * growth_factor(r_annual[..., None] / 12, k)
+    return months, values
+
+
+def yearly_curve(P, r_annual, times):
+    """Curva de la anualidad con capitalización anual de 12·P, evaluada en
+    `times` (años). Es la curva que se grafica en la comparativa."""
+    P = np.asarray(P, dtype=float)
+    r_annual = np.asarray(r_annual, dtype=float)
+    times = np.asarray(times, dtype=float)
+    return P[..., None] * 12 * growth_factor(r_annual[..., None], times)
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import annuity
+import edo
+import expenses
+import ingest
+import storage
+
+# Benchmarks de los motores de cálculo.
+# Mide cada motor (anualidad, EDO analítica/RK4/RK45, lectura de planillas)
+# con 1, 10^3 y 10^5 hogares, horizontes de 10 a 100 años y dt de 0.1 a
+# 0.001. Los casos cuyo trabajo (hogares x pasos) supera --max-work se
+# omiten y quedan registrados como tales. Cada caso se calienta y se mide
+# varias veces; se guarda la mediana y su dispersión relativa. Los
+# resultados se guardan en JSON y se comparan con una línea base: si algún
+# caso es más lento que la base por encima del umbral (ampliado por la
+# dispersión medida), el programa termina con código 1; sin línea base,
+# con código 2. La base depende de la máquina, así que no se versiona
+# (.gitignore): cada máquina guarda la suya.
+#
+#   python benchmarks.py --save-baseline          # medir y guardar la base
+#   python benchmarks.py -o resultados.json       # medir y comparar
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks_baseline.json')
+HOUSEHOLDS = (1, 10**3, 10**5)
+HORIZONS = (10, 30, 100)    # años
+DTS = (0.1, 0.01, 0.001)
+MAX_WORK = 10**7            # hogares x pasos por caso (acota también la memoria)
+MIN_SECONDS = 1e-4          # diferencias menores se consideran ruido
+
+
+def household_params(n, seed=0):
+    """Parámetros EDO de n hogares alrededor de los valores por defecto."""
+    rng = np.random.default_rng(seed)
+    return {
+        'I0': rng.uniform(1500, 3000, n),
+        'g': rng.uniform(0.0, 0.08, n),
+        'c0': rng.uniform(0, 100, n),
+        'c1': rng.uniform(0.7, 0.95, n),
+        'c2': rng.uniform(0.0, 0.2, n),
+        'r': rng.uniform(0.0, 0.06, n),
+        'A0': rng.uniform(0, 500, n),
+    }
+
+
+def _ledger_csv(path, n_households):
+    # One ledger per household, stacked, with a household_id column
+    base = expenses.default_ledger()
+    rows = len(base)
+    df = pd.DataFrame({
+        ingest.HOUSEHOLD_COL: np.repeat(np.arange(n_households), rows),
+        expenses.CATEGORY_COL: np.tile(base[expenses.CATEGORY_COL].to_numpy(), n_households),
+        expenses.MIN_COL: np.tile(base[expenses.MIN_COL].to_numpy(), n_households),
+        expenses.MAX_COL: np.tile(base[expenses.MAX_COL].to_numpy(), n_households),
+    })
+    df.to_csv(path, index=False)
+    return path
+
+
+def cases(households=HOUSEHOLDS, horizons=HORIZONS, dts=DTS, max_work=MAX_WORK, tmp_dir=None):
+    """Lista de (nombre, parámetros, trabajo, función sin argumentos)."""
+    result = []
+    for n in households:
+        p = household_params(n)
+        P = p['I0'] * 0.1
+        for years in horizons:
+            n_months = 12 * years
+            times = np.linspace(0, years, 100)
+            result.append((f'vf/future_value/n={n}/T={years}', {'n': n, 'T': years}, n,
+                           lambda P=P, p=p, m=n_months: annuity.future_value(P, p['r'], m)))
+            result.append((f'vf/yearly_curve/n={n}/T={years}', {'n': n, 'T': years}, n * times.size,
+                           lambda P=P, p=p, t=times: annuity.yearly_curve(P, p['r'], t)))
+            result.append((f'vf/trajectory/n={n}/T={years}', {'n': n, 'T': years}, n * n_months,
+                           lambda P=P, p=p, m=n_months: annuity.trajectory(P, p['r'], m)))
+            for dt in dts:
+                steps = int(round(years / dt))
+                for method in ('analytic', 'rk4'):
+                    result.append((
+                        f'edo/{method}/n={n}/T={years}/dt={dt}',
+                        {'n': n, 'T': years, 'dt': dt, 'method': method}, n * steps,
+                        lambda p=p, T=years, dt=dt, method=method: edo.solve(
+                            **p, T=T, dt=dt, method=method)))
+            result.append((f'edo/rk45/n={n}/T={years}', {'n': n, 'T': years, 'method': 'rk45'},
+                           n * years * 10,
+                           lambda p=p, T=years: edo.simulate_rk45(**p, T=T)))
+
+    if tmp_dir is not None:
+        default_csv = os.path.join(tmp_dir, 'ledger.csv')
+        expenses.default_ledger().to_csv(default_csv, index=False)
+        result.append(('csv/read_ledger', {'rows': 11}, 11,
+                       lambda: expenses.read_ledger(default_csv)))
+        for n in households:
+            path = _ledger_csv(os.path.join(tmp_dir, f'hogares_{n}.csv'), n)
+            result.append((f'csv/household_totals/n={n}', {'n': n}, n * 11,
+                           lambda path=path: ingest.household_totals(path)))
+            table = pd.read_csv(path)
+            for ext in ('.csv', '.npz'):
+                out = os.path.join(tmp_dir, f'tabla_{n}{ext}')
+                result.append((f'storage/save_load{ext}/n={n}', {'n': n, 'format': ext}, n * 11,
+                               lambda table=table, out=out: storage.load_table(
+                                   storage.save_table(table, out))))
+
+    return [case for case in result if case[2] <= max_work] + [
+        (name, params, work, None) for name, params, work, _ in result if work > max_work]
+
+
+def measure(fn, repeat=9, min_time=0.05, warmup=0.1, budget=5.0):
+    """(mediana, dispersión relativa) del tiempo por llamada en `repeat` muestras.
+
+    fn se llama primero durante al menos warmup segundos (cachés, páginas
+    de memoria, compilación de Numba). Cada muestra repite fn hasta durar
+    al menos min_time segundos, para que los casos rápidos no queden
+    dominados por el ruido del reloj; se corta antes si el total pasa de
+    budget segundos (con al menos 3 muestras). La dispersión es el rango
+    intercuartílico dividido por la mediana.
+    """
+    start = time.perf_counter()
+    calls = 0
+    while True:
+        fn()
+        calls += 1
+        spent = time.perf_counter() - start
+        if spent >= warmup or spent > budget / 2:
+            break
+    loops = max(1, int(min_time * calls / spent)) if spent > 0 else 1000
+    samples = []
+    for _ in range(repeat):
+        if spent > budget and len(samples) >= 3:
+            break
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / loops)
+        spent += elapsed
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return float(median), float((q3 - q1) / median) if median > 0 else 0.0
+
+
+def run(case_list, repeat=9, progress=print):
+    results = {}
+    for k, (name, params, work, fn) in enumerate(case_list, 1):
+        if fn is None:
+            results[name] = {'params': params, 'work': work, 'seconds': None, 'skipped': True}
+            continue
+        seconds, spread = measure(fn, repeat)
+        results[name] = {'params': params, 'work': work, 'seconds': seconds, 'spread': spread}
+        if progress is not None:
+            progress(f"[{k}/{len(case_list)}] {name}: {seconds * 1000:.2f} ms (±{spread:.0%})")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=0.25, min_seconds=MIN_SECONDS):
+    """Casos más lentos que la base en más de `threshold` (fracción).
+
+    El umbral de cada caso se amplía con la dispersión medida (la mayor de
+    la base y la actual, dos veces), para no marcar casos ruidosos.
+    Devuelve una lista de (nombre, segundos base, segundos actuales).
+    """
+    regressions = []
+    for name, entry in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or base.get('seconds') is None or entry.get('seconds') is None:
+            continue
+        old, new = base['seconds'], entry['seconds']
+        tolerance = threshold + 2 * max(base.get('spread', 0.0), entry.get('spread', 0.0))
+        if new > old * (1 + tolerance) and new - old > min_seconds:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='benchmarks', description='Benchmarks de los motores de cálculo')
+    parser.add_argument('-o', '--output', help='Archivo JSON con los resultados')
+    parser.add_argument('--baseline', default=BASELINE, help='Línea base a comparar')
+    parser.add_argument('--save-baseline', action='store_true', help='Guarda los resultados como línea base')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Fracción de tiempo extra tolerada (0.25 = 25%%)')
+    parser.add_argument('--max-work', type=float, default=MAX_WORK,
+                        help='Omite casos con más de este número de hogares x pasos')
+    parser.add_argument('--repeat', type=int, default=9, help='Muestras por caso (se usa la mediana)')
+    parser.add_argument('--filter', help='Solo casos cuyo nombre contenga este texto')
+    parser.add_argument('--quick', action='store_true', help='Solo 1 y 1000 hogares y T=10')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    households, horizons = (HOUSEHOLDS[:2], HORIZONS[:1]) if args.quick else (HOUSEHOLDS, HORIZONS)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        case_list = cases(households, horizons, DTS, args.max_work, tmp_dir)
+        if args.filter:
+            case_list = [case for case in case_list if args.filter in case[0]]
+        current = run(case_list, args.repeat)
+
+    skipped = sum(1 for entry in current['results'].values() if entry.get('skipped'))
+    if skipped:
+        print(f"{skipped} casos omitidos por superar --max-work")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No hay línea base en {args.baseline}; use --save-baseline", file=sys.stderr)
+        return 2
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('platform') != current['meta']['platform']:
+        print(f"Aviso: la línea base es de otra máquina ({baseline['meta'].get('platform')})")
+    regressions = compare(current, baseline, args.threshold)
+    for name, old, new in regressions:
+        print(f"MÁS LENTO {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({new / old:.2f}x)")
+    if regressions:
+        return 1
+    print(f"Sin regresiones respecto a {args.baseline} (umbral {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
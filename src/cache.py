@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+# Caché de resultados de simulación.
+# La clave se obtiene de los parámetros normalizados (floats, claves
+# ordenadas), de la configuración del solver y de SOLVER_VERSION. En
+# memoria se usa LRU con un presupuesto en bytes; opcionalmente cada
+# entrada se guarda también como .npz en `path` para reutilizarla al
+# reiniciar la aplicación, con otro presupuesto en bytes para el
+# directorio (se borran primero los archivos usados hace más tiempo).
+# Los arrays devueltos son de solo lectura: se comparten entre llamadas.
+
+# Subir al cambiar un solver o la forma de sus resultados, para que las
+# entradas guardadas en disco por versiones anteriores dejen de coincidir
+SOLVER_VERSION = 2
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (bool, str)) or value is None:
+        return value
+    return float(value)
+
+
+def make_key(kind, params, **settings):
+    """Clave estable para (tipo de modelo, parámetros, configuración)."""
+    payload = json.dumps([SOLVER_VERSION, kind, _normalize(params), _normalize(settings)],
+                         sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _nbytes(value):
+    return sum(np.asarray(v).nbytes for v in value)
+
+
+class ResultCache:
+    def __init__(self, max_bytes=64 * 2**20, path=None, max_disk_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.path = path
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self.prune()
+
+    def _file(self, key):
+        return os.path.join(self.path, f'{key}.npz')
+
+    def get(self, key):
+        """Tupla de arrays guardada bajo `key`, o None."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.path is not None and os.path.exists(self._file(key)):
+            try:
+                with np.load(self._file(key)) as data:
+                    value = tuple(data[f'arr_{i}'] for i in range(len(data.files)))
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self._touch(key)
+                value = self._store(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        # Views, so marking them read-only leaves the caller's arrays writable
+        value = self._store(key, tuple(np.asarray(v).view() for v in value))
+        if self.path is not None:
+            tmp = self._file(key) + '.tmp.npz'
+            np.savez(tmp, *value)
+            os.replace(tmp, self._file(key))
+            self.prune()
+        return value
+
+    def _touch(self, key):
+        # The modification time orders the files for pruning
+        try:
+            os.utime(self._file(key))
+        except OSError:
+            pass
+
+    def prune(self):
+        """Borra los .npz usados hace más tiempo hasta que el directorio
+        quede dentro de max_disk_bytes."""
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.npz') and entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _store(self, key, value):
+        for array in value:
+            array.flags.writeable = False
+        if key in self.entries:
+            self.size -= _nbytes(self.entries.pop(key))
+        nbytes = _nbytes(value)
+        if nbytes > self.max_bytes:
+            return value
+        self.entries[key] = value
+        self.size += nbytes
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= _nbytes(evicted)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
@@ -0,0 +1,471 @@
+"""Interfaz de línea de comandos, sin tkinter (matplotlib solo para --plot).
+
+Ejemplos (desde src/):
+    python -m calculadora vf --P 161 --r_annual 0.03 --n_months 120
+    python -m calculadora edo --config params.json --format csv -o edo.csv
+    python -m calculadora edo --batch hogares.csv -o finales.csv --trajectories tray.npz
+    python -m calculadora gastos --csv ../data/consumo_cochabamba.csv
+    python -m calculadora hogares planillas/ --format csv -o totales.csv
+    python -m calculadora escenarios --csv ../data/consumo_cochabamba.csv --income 3000
+    python -m calculadora montecarlo --paths 100000 --seed 0 --plot abanico.png
+    python -m calculadora objetivo --model vf --solve P --target 50000
+    python -m calculadora objetivo --model edo --solve c1 --target 100000 --batch hogares.csv
+    python -m calculadora deuda --loans prestamos.csv --format csv -o cuotas.csv
+
+--config (todos salvo deuda y hogares) lee un JSON con los mismos nombres
+de los argumentos (p.ej. {"csv": ..., "paths": 1000} en montecarlo); los
+argumentos explícitos tienen prioridad. Con --batch se lee un CSV con una columna por
+parámetro (una fila por hogar) y se escribe un valor final por hogar.
+Con --schedule (vf y edo) la tasa y el ingreso siguen las series mensuales
+de un CSV (ver schedules.py). --loans lee préstamos (capital, tasa, plazo,
+extra; ver loans.py): en gastos su cuota va a la fila 'Deuda' y en vf/edo
+los pagos mes a mes se descuentan del ahorro hasta cancelarlos.
+--inflation 0.04 0.06 (vf y edo) agrega, junto a cada valor nominal, su
+valor real para cada inflación anual (y para la columna 'inflacion' de
+--schedule, si existe); en lote también a las trayectorias guardadas.
+En formato json se escriben parámetros, resumen y tabla; en csv, solo la
+tabla. --instrument muestra en stderr los tiempos y contadores del cálculo
+(pasos RK4, evaluaciones, filas leídas) y --profile guarda un perfil
+cProfile.
+"""
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+import annuity
+import edo
+import instrument
+from expenses import SAMPLE_CSV
+from goalseek import EDO_UNKNOWNS, VF_UNKNOWNS
+
+VF_DEFAULTS = {'P': 161, 'r_annual': 0.03, 'n_months': 120}
+EDO_DEFAULTS = {'I0': 2061, 'g': 0.05, 'c0': 50, 'c1': 0.9, 'c2': 0.1,
+                'r': 0.03, 'A0': 161, 'T': 10}
+EDO_SETTINGS = {'method': 'analytic', 'dt': 0.1, 'rtol': 1e-6, 'atol': 1e-3}
+GASTOS_DEFAULTS = {'csv': SAMPLE_CSV, 'income': None, 'loans': None}
+ESCENARIOS_DEFAULTS = {'csv': SAMPLE_CSV, 'income': None, 'levels': 2, 'samples': None, 'seed': None}
+MONTECARLO_DEFAULTS = {'csv': SAMPLE_CSV, 'income': None, 'paths': 100000, 'months': 120,
+                       'seed': None, 'plot': None}
+
+
+def run_vf(params, series=None, inflation=()):
+    P, r_annual, n_months = (params[k] for k in ('P', 'r_annual', 'n_months'))
+    if series is None:
+        FV = annuity.future_value(P, r_annual, n_months)
+        total = np.asarray(P, dtype=float) * np.asarray(n_months, dtype=float)
+    else:
+        months, values, total = _vf_with_series(P, r_annual, n_months, series)
+        FV = values[np.arange(values.shape[0]), np.broadcast_to(n_months, values.shape[0])]
+        if np.ndim(np.broadcast(P, r_annual, n_months)) == 0:
+            FV, total = FV[0], total[0]
+    summary = {'FV': FV, 'total_contributions': total, 'interest_earned': FV - total}
+    if np.ndim(FV) == 0:
+        if series is None:
+            months, values = annuity.trajectory(P, r_annual, n_months)
+        else:
+            values = values[0, :int(n_months) + 1]
+            months = months[:values.size]
+        table = {'month': months, 'value': values}
+        table.update(real_columns('value', values, months / 12, inflation, series))
+    else:
+        table = dict(params, FV=FV)
+    real = real_columns('FV', FV, np.asarray(n_months) / 12, inflation, series, grid=False)
+    summary.update(real)
+    if np.ndim(FV) != 0:
+        table.update(real)
+    return summary, table
+
+
+def _vf_with_series(P, r_annual, n_months, series):
+    # Monthly balances with the rate (and contributions) following the
+    # series; the same run at rate 0 gives the total contributed
+    from schedules import DEBT_COL, INCOME_COL, RATE_COL, vf_trajectory
+
+    P, r_annual, n_months = (np.atleast_1d(a) for a in np.broadcast_arrays(
+        np.asarray(P, dtype=float), np.asarray(r_annual, dtype=float), np.asarray(n_months, dtype=int)))
+    rates, spread = (series[RATE_COL], 0.0) if RATE_COL in series else (np.zeros(1), r_annual)
+    horizon = int(n_months.max())
+    contributions, debt = series.get(INCOME_COL), series.get(DEBT_COL)
+    months, values = vf_trajectory(P, rates, horizon, contributions, spread, debt)
+    _, paid = vf_trajectory(P, np.zeros(1), horizon, contributions, debt=debt)
+    return months, values, paid[np.arange(P.size), n_months]
+
+
+def run_edo(params, method='analytic', dt=0.1, rtol=1e-6, atol=1e-3, trajectories=None,
+            series=None, inflation=()):
+    args = [params[k] for k in edo.PARAM_NAMES]
+    info = {}
+    if series is None:
+        times, A_values, I_values, C_values, info = edo.solve(
+            *args, params['T'], dt=dt, method=method, rtol=rtol, atol=atol, return_info=True)
+    else:
+        import schedules
+
+        times, A_values, I_values, C_values = schedules.solve(*args, params['T'], series, dt=dt)
+    if trajectories:
+        from storage import save_trajectories
+
+        batch = dict(zip(edo.PARAM_NAMES, edo.as_batch(*args)))
+        save_trajectories(trajectories, times, params=batch, A=A_values, I=I_values, C=C_values,
+                          **real_columns('A', A_values, times, inflation, series))
+    final = real_columns('A_final', A_values[:, -1], params['T'], inflation, series, grid=False)
+    # RK45 step statistics; the accumulated error estimate is per household
+    info = info if method == 'rk45' else {}
+    if info:
+        final['error_estimate'] = info.pop('error_estimate')
+    if A_values.shape[0] == 1:
+        table = {'t': times, 'A': A_values[0], 'I': I_values[0], 'C': C_values[0]}
+        table.update(real_columns('A', A_values[0], times, inflation, series))
+        return dict({'A_final': A_values[0, -1]}, **info, **{k: v[0] for k, v in final.items()}), table
+    table = dict(params, A_final=A_values[:, -1], **final)
+    return dict({'A_final': A_values[:, -1]}, **info, **final), table
+
+
+def real_columns(name, values, times, inflation, series=None, grid=True):
+    # Nominal values deflated for each inflation assumption (and the
+    # series' 'inflacion' column, if any), as '<name>_real_<rate>' columns;
+    # grid=False for per-household times, whose factors are not cached
+    from schedules import INFLATION_COL
+
+    inflation_series = series.get(INFLATION_COL) if series else None
+    if not inflation and inflation_series is None:
+        return {}
+    from inflation import deflate
+
+    return {f'{name}_{key}': real for key, real in
+            deflate(values, times, inflation, inflation_series, grid=grid).items()}
+
+
+def run_gastos(path, income=None, debt=None):
+    import expenses
+
+    df = expenses.read_ledger(path)
+    instrument.count('expenses.rows_loaded', len(df))
+    if income is not None:
+        expenses.set_income(df, income)
+    if debt is not None:
+        expenses.set_debt(df, float(debt[0]))
+    summary = expenses.savings_summary(df)
+    table = {col: df[col].to_numpy() for col in df.columns}
+    return summary, table
+
+
+def run_escenarios(path, income=None, levels=2, samples=None, seed=None):
+    import expenses
+    import scenarios
+    from montecarlo import expense_ranges
+
+    df = expenses.read_ledger(path)
+    if income is not None:
+        expenses.set_income(df, income)
+    mins, maxs, income = expense_ranges(df)
+    result = scenarios.run(mins, maxs, income, levels=levels, n_samples=samples, seed=seed)
+    summary = {k: result[k] for k in ('n_scenarios', 'sampled', 'min_savings', 'max_savings',
+                                      'mean', 'std', 'p_deficit')}
+    summary.update({f'P{q}': v for q, v in result['quantiles'].items()})
+    table = {'savings_from': result['edges'][:-1], 'savings_to': result['edges'][1:],
+             'count': result['counts']}
+    return summary, table
+
+
+def run_montecarlo(path, income=None, edo_params=None, paths=100000, months=120, seed=None,
+                   plot=None):
+    import expenses
+    import montecarlo
+
+    df = expenses.read_ledger(path)
+    if income is not None:
+        expenses.set_income(df, income)
+    mins, maxs, income = montecarlo.expense_ranges(df)
+    edo_params = dict(EDO_DEFAULTS, I0=income, **(edo_params or {}))
+    result = montecarlo.run(paths, mins, maxs, income, edo_params, n_months=months, seed=seed)
+    if plot:
+        montecarlo.save_fan(plot, result)
+    # Final values per model; the table has one row per (model, time)
+    summary = {'paths': paths}
+    for model, fan in result.items():
+        summary[f'{model}_mean'] = fan['mean'][-1]
+        summary[f'{model}_nonfinite'] = int(fan['nonfinite'][-1])
+        summary.update({f'{model}_P{q}': v[-1] for q, v in fan['percentiles'].items()})
+    fans = list(result.items())
+    table = {'model': np.concatenate([np.full(fan['times'].size, model) for model, fan in fans]),
+             't': np.concatenate([fan['times'] for _, fan in fans]),
+             'mean': np.concatenate([fan['mean'] for _, fan in fans])}
+    for q in fans[0][1]['percentiles']:
+        table[f'P{q}'] = np.concatenate([fan['percentiles'][q] for _, fan in fans])
+    return summary, table
+
+
+def run_objetivo(model, unknown, target, params):
+    import goalseek
+
+    if model == 'vf':
+        known = {k: v for k, v in params.items() if k != unknown}
+        solution = goalseek.solve_vf(target, unknown, **known)
+    else:
+        known = {k: v for k, v in params.items() if k not in (unknown, 'T')}
+        solution = goalseek.solve_edo(target, unknown, known, params['T'])
+    table = dict(params, target=target)
+    table[unknown] = solution
+    return {unknown: solution}, table
+
+
+def run_deuda(loan_table):
+    import loans
+
+    args = [loan_table[c] for c in (loans.PRINCIPAL_COL, loans.RATE_COL, loans.TERM_COL, loans.EXTRA_COL)]
+    per_loan = loans.summary(*args)
+    totals = loans.monthly_payments(*args)
+    instrument.count('loans.amortized', args[0].size)
+    summary = {'loans': args[0].size, 'first_payment': totals[0],
+               'payoff_month': int(per_loan['months'].max()),
+               'total_interest': per_loan['total_interest'].sum()}
+    if args[0].size == 1:
+        schedule = loans.schedule(*args)
+        table = {k: v[0] if k != 'month' else v for k, v in schedule.items()}
+    else:
+        table = {'month': np.arange(1, totals.size + 1), 'payment': totals}
+    return summary, table
+
+
+def run_hogares(path, chunksize=500000):
+    from ingest import household_totals
+
+    totals = household_totals(path, chunksize=chunksize)
+    instrument.count('hogares.households', len(totals))
+    summary = {'households': len(totals),
+               'total_min_savings': totals['min_savings'].sum(),
+               'total_max_savings': totals['max_savings'].sum()}
+    table = {col: totals[col].to_numpy() for col in totals.columns}
+    return summary, table
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def write_output(params, summary, table, fmt, output):
+    out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        if fmt == 'json':
+            json.dump(_jsonable({'params': params, 'summary': summary, 'table': table}),
+                      out, indent=2, ensure_ascii=False)
+            out.write('\n')
+        else:
+            columns = list(table)
+            rows = np.broadcast_arrays(*(np.asarray(table[c]) for c in columns))
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            writer.writerows(zip(*(r.tolist() for r in rows)))
+    finally:
+        if output:
+            out.close()
+
+
+def load_series(path, loans_path=None):
+    series = {}
+    if path:
+        from schedules import load_series as load
+
+        series = load(path)
+    if loans_path:
+        from schedules import DEBT_COL
+
+        series[DEBT_COL] = load_debt(loans_path)
+    return series or None
+
+
+def load_debt(loans_path):
+    # Total monthly payment of the loans in the file, month 1 first
+    import loans
+
+    table = loans.read_loans(loans_path)
+    return loans.monthly_payments(*(table[c] for c in (loans.PRINCIPAL_COL, loans.RATE_COL,
+                                                       loans.TERM_COL, loans.EXTRA_COL)))
+
+
+def load_params(defaults, args):
+    params = dict(defaults)
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            params.update(json.load(f))
+    if getattr(args, 'batch', None):
+        with open(args.batch, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        for name in defaults:
+            if rows and name in rows[0]:
+                params[name] = np.array([float(row[name]) for row in rows])
+    for name in defaults:
+        value = getattr(args, name, None)
+        if value is not None:
+            params[name] = value
+    return params
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='calculadora', description='Calculadora de ahorro financiero')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def common(p, config=True):
+        if config:
+            p.add_argument('--config', help='JSON con parámetros')
+        p.add_argument('--format', choices=['json', 'csv'], default='json')
+        p.add_argument('-o', '--output', help='Archivo de salida (por defecto stdout)')
+        p.add_argument('--instrument', action='store_true',
+                       help='Muestra tiempos y contadores en stderr al terminar')
+        p.add_argument('--profile', metavar='ARCHIVO', help='Guarda un perfil cProfile (.prof)')
+
+    vf = sub.add_parser('vf', help='Valor futuro de una anualidad discreta')
+    common(vf)
+    vf.add_argument('--batch', help='CSV con columnas P, r_annual, n_months')
+    vf.add_argument('--P', type=float)
+    vf.add_argument('--r_annual', type=float)
+    vf.add_argument('--n_months', type=int)
+    vf.add_argument('--schedule', help='CSV con series mensuales (tasa, ingreso)')
+    vf.add_argument('--loans', help='CSV de préstamos; lo que se deja de pagar se suma al aporte')
+    vf.add_argument('--inflation', type=float, nargs='+', default=[],
+                    help='Inflaciones anuales (decimal); agrega columnas en valores reales')
+
+    edo_parser = sub.add_parser('edo', help='Modelo continuo (EDO)')
+    common(edo_parser)
+    edo_parser.add_argument('--batch', help='CSV con una columna por parámetro')
+    for name in EDO_DEFAULTS:
+        edo_parser.add_argument(f'--{name}', type=float)
+    edo_parser.add_argument('--method', choices=['analytic', 'rk4', 'rk45'])
+    edo_parser.add_argument('--dt', type=float)
+    edo_parser.add_argument('--rtol', type=float)
+    edo_parser.add_argument('--atol', type=float)
+    edo_parser.add_argument('--schedule',
+                            help='CSV con series mensuales (tasa, ingreso); ignora --method')
+    edo_parser.add_argument('--loans', help='CSV de préstamos; sus pagos se descuentan del ahorro')
+    edo_parser.add_argument('--inflation', type=float, nargs='+', default=[],
+                            help='Inflaciones anuales (decimal); agrega columnas en valores reales')
+    edo_parser.add_argument('--trajectories', help='Guarda las trayectorias A/I/C (hogares x tiempo) en un .npz')
+
+    gastos = sub.add_parser('gastos', help='Totales de gasto y ahorro de una planilla CSV')
+    common(gastos)
+    gastos.add_argument('--csv', help='Planilla de gastos (por defecto la de ejemplo, data/consumo_cochabamba.csv)')
+    gastos.add_argument('--income', type=float)
+    gastos.add_argument('--loans', help='CSV de préstamos; la cuota del primer mes va a la fila Deuda')
+
+    deuda = sub.add_parser('deuda', help='Amortización de préstamos (capital, tasa, plazo, extra)')
+    common(deuda, config=False)
+    deuda.add_argument('--loans', required=True, help='CSV con una fila por préstamo')
+
+    escenarios = sub.add_parser('escenarios', help='Distribución del ahorro sobre combinaciones de gasto Mín/Máx')
+    common(escenarios)
+    escenarios.add_argument('--csv', help='Planilla de gastos (por defecto la de ejemplo, data/consumo_cochabamba.csv)')
+    escenarios.add_argument('--income', type=float)
+    escenarios.add_argument('--levels', type=int,
+                            help='Niveles por categoría entre Mín y Máx (por defecto 2 = solo los extremos)')
+    escenarios.add_argument('--samples', type=int,
+                            help='Sortea esta cantidad de escenarios uniformes (por defecto se '
+                                 'recorre la malla completa, o se sortean 10^6 si pasa de 2^20)')
+    escenarios.add_argument('--seed', type=int)
+
+    mc = sub.add_parser('montecarlo', help='Abanico Monte Carlo de la anualidad y la EDO')
+    common(mc)
+    mc.add_argument('--csv', help='Planilla de gastos (por defecto la de ejemplo, data/consumo_cochabamba.csv)')
+    mc.add_argument('--income', type=float)
+    mc.add_argument('--paths', type=int, help='Cantidad de trayectorias (por defecto 100000)')
+    mc.add_argument('--months', type=int, help='Plazo de la anualidad en meses (por defecto 120)')
+    mc.add_argument('--seed', type=int)
+    mc.add_argument('--plot', help='Guarda el gráfico de abanico (png, pdf, svg)')
+    for name in EDO_DEFAULTS:
+        mc.add_argument(f'--{name}', type=float,
+                        help='Parámetro de la EDO (I0 por defecto: el ingreso)' if name == 'I0' else None)
+
+    objetivo = sub.add_parser('objetivo', help='Despeja un parámetro para alcanzar un valor final')
+    common(objetivo)
+    objetivo.add_argument('--model', choices=['vf', 'edo'], default='vf')
+    objetivo.add_argument('--solve', required=True, choices=VF_UNKNOWNS + EDO_UNKNOWNS,
+                          metavar='PARÁMETRO',
+                          help=f"Parámetro a despejar: {', '.join(VF_UNKNOWNS)} con --model vf; "
+                               f"{', '.join(EDO_UNKNOWNS)} con --model edo")
+    objetivo.add_argument('--target', type=float, help='Valor final buscado (o columna target en --batch)')
+    objetivo.add_argument('--batch', help='CSV con una columna por parámetro')
+    for name in list(VF_DEFAULTS) + list(EDO_DEFAULTS):
+        objetivo.add_argument(f'--{name}', type=float)
+
+    hogares = sub.add_parser('hogares', help='Totales por hogar de un CSV grande o un directorio de CSV')
+    common(hogares, config=False)
+    hogares.add_argument('path', help='CSV con columna household_id o directorio con un CSV por hogar')
+    hogares.add_argument('--chunksize', type=int, default=500000)
+    return parser
+
+
+def run_command(args):
+    if args.command == 'vf':
+        params = load_params(VF_DEFAULTS, args)
+        params['n_months'] = np.asarray(params['n_months']).astype(int)
+        summary, table = run_vf(params, load_series(args.schedule, args.loans), args.inflation)
+        params['inflation'] = args.inflation
+    elif args.command == 'edo':
+        params = load_params(EDO_DEFAULTS, args)
+        settings = {k: params.pop(k, default) for k, default in EDO_SETTINGS.items()}
+        settings.update({k: getattr(args, k) for k in EDO_SETTINGS if getattr(args, k) is not None})
+        summary, table = run_edo(params, trajectories=args.trajectories,
+                                 series=load_series(args.schedule, args.loans),
+                                 inflation=args.inflation, **settings)
+        params.update(settings, inflation=args.inflation)
+    elif args.command == 'escenarios':
+        params = load_params(ESCENARIOS_DEFAULTS, args)
+        summary, table = run_escenarios(*(params[k] for k in ESCENARIOS_DEFAULTS))
+    elif args.command == 'montecarlo':
+        # EDO parameters left unset keep run_montecarlo's defaults (I0 = income)
+        params = load_params(dict(MONTECARLO_DEFAULTS, **dict.fromkeys(EDO_DEFAULTS)), args)
+        edo_params = {k: params.pop(k) for k in EDO_DEFAULTS}
+        edo_params = {k: v for k, v in edo_params.items() if v is not None}
+        summary, table = run_montecarlo(params['csv'], params['income'], edo_params,
+                                        params['paths'], params['months'], params['seed'],
+                                        params['plot'])
+        params.update(edo_params)
+    elif args.command == 'objetivo':
+        unknowns = VF_UNKNOWNS if args.model == 'vf' else EDO_UNKNOWNS
+        if args.solve not in unknowns:
+            raise SystemExit(f"--solve {args.solve} no es un parámetro del modelo {args.model} "
+                             f"({', '.join(unknowns)})")
+        params = load_params(dict(VF_DEFAULTS if args.model == 'vf' else EDO_DEFAULTS, target=None), args)
+        target = params.pop('target')
+        if target is None:
+            raise SystemExit("Falta --target")
+        summary, table = run_objetivo(args.model, args.solve, target, params)
+        params.pop(args.solve, None)
+        params.update(model=args.model, solve=args.solve, target=target)
+    elif args.command == 'deuda':
+        import loans
+
+        params = {'loans': args.loans}
+        summary, table = run_deuda(loans.read_loans(args.loans))
+    elif args.command == 'hogares':
+        params = {'path': args.path, 'chunksize': args.chunksize}
+        summary, table = run_hogares(args.path, args.chunksize)
+    else:
+        params = load_params(GASTOS_DEFAULTS, args)
+        debt = load_debt(params['loans']) if params['loans'] else None
+        summary, table = run_gastos(params['csv'], params['income'], debt)
+    return summary, table, params
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.instrument or args.profile:
+        instrument.enable(args.profile)
+
+    with instrument.span(f'calculadora.{args.command}'):
+        summary, table, params = run_command(args)
+
+    with instrument.span('write_output'):
+        write_output(params, summary, table, args.format, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
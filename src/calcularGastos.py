@@ -1,5 +1,7 @@
 import pandas as pd
 
+from expenses import savings_summary
+
 def generar_csv_consumo(path_csv: str = 'data/consumo_cochabamba.csv'):
     data = {
         'Categoría': [
@@ -22,14 +24,12 @@ def calcular_gastos_y_ahorro(path_csv: str = 'data/consumo_cochabamba.csv'):
     # Mostrar la tabla
     print("\nPlanilla de Consumo Mensual:")
     print(df.to_string(index=False))
-    # Cálculo de totales
-    gastos = df[df['Categoría'] != 'Ingreso']
-    gasto_min = gastos['Gasto Mín (Bs.)'].sum()
-    gasto_max = gastos['Gasto Máx (Bs.)'].sum()
-    ingreso = df.loc[df['Categoría'] == 'Ingreso', 'Gasto Mín (Bs.)'].iloc[0]
-    # Ahorros
-    ahorro_escenario_min_gasto = ingreso - gasto_max   # escenario gasto máximo
-    ahorro_escenario_max_gasto = ingreso - gasto_min   # escenario gasto mínimo
+    # Cálculo de totales y ahorros
+    resumen = savings_summary(df)
+    gasto_min = resumen['total_min_expense']
+    gasto_max = resumen['total_max_expense']
+    ahorro_escenario_min_gasto = resumen['min_savings']   # escenario gasto máximo
+    ahorro_escenario_max_gasto = resumen['max_savings']   # escenario gasto mínimo
 
     print(f"\nTotal gasto mínimo: Bs. {gasto_min}")
     print(f"Total gasto máximo: Bs. {gasto_max}")
@@ -0,0 +1,283 @@
+import numpy as np
+
+import instrument
+import kernels
+
+# Modelo continuo de ahorro (EDO):
+#   I(t) = I0 * e^(g t)
+#   C(t) = c0 + c1 I - c2 A
+#   dA/dt = I - C + r A
+# Las funciones aceptan escalares o arrays con un valor por hogar.
+
+PARAM_NAMES = ('I0', 'g', 'c0', 'c1', 'c2', 'r', 'A0')
+
+
+def dAdt(t, A, I0, g, c0, c1, c2, r):
+    I = I0 * np.exp(g * t)  # Income grows exponentially
+    C = c0 + c1 * I - c2 * A  # Consumption function
+    return I - C + r * A
+
+
+def as_batch(I0, g, c0, c1, c2, r, A0):
+    # Broadcast the parameters to 1-D float arrays of equal length N
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float))
+                                   for p in (I0, g, c0, c1, c2, r, A0)))
+    return [a.ravel() for a in arrays]
+
+
+def grid_steps(T, t0=0.0, dt=0.1):
+    """Pasos de la malla t0, t0 + dt, ..., T: int((T - t0) / dt), sin que
+    el redondeo pierda el último punto (9.7 / 0.1 = 96.99999999999999)."""
+    return int((T - t0) / dt + 1e-9)
+
+
+def simulate_rk4(I0, g, c0, c1, c2, r, A0, T, t0=0.0, dt=0.1, progress=None):
+    """RK4 con paso fijo para N conjuntos de parámetros a la vez.
+
+    Devuelve (times, A, I, C); times tiene forma (steps,) y las
+    trayectorias forma (N, steps), con steps = grid_steps(T, t0, dt) + 1.
+    progress(done, total), si se da, se llama periódicamente con el avance
+    en años; puede lanzar una excepción para cancelar.
+    """
+    I0, g, c0, c1, c2, r, A0 = as_batch(I0, g, c0, c1, c2, r, A0)
+    n_steps = grid_steps(T, t0, dt)
+    times = np.linspace(t0, T, n_steps + 1)
+
+    # Preallocated trajectories
+    A_values = np.empty((I0.size, n_steps + 1))
+    I_values = np.empty_like(A_values)
+
+    A = A0.copy()
+    I_start = I0 * np.exp(g * t0)
+    A_values[:, 0] = A
+    I_values[:, 0] = I_start
+
+    # The equation is linear in A: dA/dt = (1 - c1) I - c0 + (c2 + r) A.
+    # Income advances by constant factors e^(g dt/2) and e^(g dt), so the
+    # steps need no exp; they run in blocks between progress reports, in
+    # the compiled kernel when Numba is available.
+    net = 1 - c1
+    k = c2 + r
+    e_half = np.exp(g * (dt / 2))
+    e_full = np.exp(g * dt)
+    report_every = max(1, n_steps // 100)
+    for start in range(1, n_steps + 1, report_every):
+        stop = min(start + report_every, n_steps + 1)
+        kernels.rk4_block(A, I_start, e_half, e_full, net, c0, k, dt, A_values, I_values, start, stop)
+        if progress is not None:
+            progress((stop - 1) * dt, T - t0)
+
+    C_values = c0[:, None] + c1[:, None] * I_values - c2[:, None] * A_values
+    instrument.count('edo.rk4_steps', n_steps)
+    instrument.count('edo.rk4_evaluations', 4 * n_steps * I0.size)
+    return times, A_values, I_values, C_values
+
+
+def _phi(x):
+    # (e^x - 1) / x, with the removable singularity phi(0) = 1
+    zero = x == 0
+    return np.where(zero, 1.0, np.expm1(x) / np.where(zero, 1.0, x))
+
+
+def simulate_analytic(I0, g, c0, c1, c2, r, A0, times, t0=0.0):
+    """Solución exacta de la EDO evaluada en `times`.
+
+    Con k = c2 + r y tau = t - t0:
+        A(t) = e^(k tau) A0
+             + (1 - c1) I0 e^(g t0) e^(k tau) tau phi((g - k) tau)
+             - c0 tau phi(k tau)
+    donde phi(x) = (e^x - 1) / x cubre los casos g = k y k = 0.
+    Devuelve (A, I, C) con forma (N, len(times)).
+    """
+    I0, g, c0, c1, c2, r, A0 = (p[:, None] for p in as_batch(I0, g, c0, c1, c2, r, A0))
+    times = np.asarray(times, dtype=float)
+    k = c2 + r
+    tau = times - t0
+    growth = np.exp(k * tau)
+    with np.errstate(over='ignore', invalid='ignore'):
+        A_values = (growth * A0
+                    + (1 - c1) * I0 * np.exp(g * t0) * growth * tau * _phi((g - k) * tau)
+                    - c0 * tau * _phi(k * tau))
+    I_values = I0 * np.exp(g * times)
+    C_values = c0 + c1 * I_values - c2 * A_values
+    return A_values, I_values, C_values
+
+
+# Dormand-Prince 5(4) tableau and the 4th-order dense-output polynomial
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_DP_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+
+class DenseSolution:
+    """Resultado de simulate_rk45: se puede evaluar en cualquier malla de
+    tiempos dentro de [t0, T] sin volver a integrar."""
+
+    def __init__(self, params, t_steps, A_steps, Q, nfev, n_rejected, max_error, error_estimate):
+        self.params = params
+        self.t_steps = t_steps          # (m + 1,) step boundaries
+        self.A_steps = A_steps          # (N, m + 1) A at the boundaries
+        self.Q = Q                      # (m, N, 4) interpolant coefficients
+        self.nfev = nfev
+        self.n_steps = len(t_steps) - 1
+        self.n_rejected = n_rejected
+        self.max_error = max_error      # max normalized local error (<= 1)
+        self.error_estimate = error_estimate  # (N,) accumulated |local error|
+
+    def __call__(self, times):
+        """A(t) en `times`, con forma (N, len(times))."""
+        times = np.asarray(times, dtype=float)
+        if self.n_steps == 0:
+            # T == t0: the solution is the initial state
+            return np.repeat(self.A_steps[:, :1], times.size, axis=1)
+        idx = np.clip(np.searchsorted(self.t_steps, times, side='right') - 1,
+                      0, self.n_steps - 1)
+        h = self.t_steps[idx + 1] - self.t_steps[idx]
+        x = (times - self.t_steps[idx]) / h
+        powers = np.stack([x, x**2, x**3, x**4], axis=-1)       # (len, 4)
+        Q = self.Q[idx]                                          # (len, N, 4)
+        delta = np.einsum('lnj,lj->nl', Q, powers) * h
+        return self.A_steps[:, idx] + delta
+
+    def trajectories(self, times):
+        """(A, I, C) en `times`, igual que simulate_analytic."""
+        I0, g, c0, c1, c2, r, A0 = (p[:, None] for p in self.params)
+        A_values = self(times)
+        I_values = I0 * np.exp(g * np.asarray(times, dtype=float))
+        C_values = c0 + c1 * I_values - c2 * A_values
+        return A_values, I_values, C_values
+
+    def info(self):
+        """Diagnóstico de la integración: evaluaciones, pasos, rechazos y errores."""
+        return {'nfev': self.nfev, 'n_steps': self.n_steps, 'n_rejected': self.n_rejected,
+                'max_error': self.max_error, 'error_estimate': self.error_estimate}
+
+
+def simulate_rk45(I0, g, c0, c1, c2, r, A0, T, t0=0.0, rtol=1e-6, atol=1e-3,
+                  max_steps=100000, progress=None):
+    """Runge-Kutta adaptativo (Dormand-Prince 5(4)) con salida densa.
+
+    Todos los hogares avanzan con el mismo paso, elegido para que el error
+    local estimado de cada uno cumpla atol + rtol * |A|.
+    """
+    params = as_batch(I0, g, c0, c1, c2, r, A0)
+    I0, g, c0, c1, c2, r, A0 = params
+
+    def f(t, A):
+        return dAdt(t, A, I0, g, c0, c1, c2, r)
+
+    t = float(t0)
+    A = A0.copy()
+    k1 = f(t, A)
+    nfev = 1
+
+    # Initial step from the scale of the solution and its derivative
+    scale = atol + rtol * np.abs(A)
+    d0 = np.max(np.abs(A) / scale)
+    d1 = np.max(np.abs(k1) / scale)
+    h = 0.01 * d0 / d1 if d0 > 1e-5 and d1 > 1e-5 else 1e-6
+    h = min(h, T - t)
+
+    t_steps = [t]
+    A_steps = [A]
+    Q_steps = []
+    n_rejected = 0
+    max_error = 0.0
+    error_estimate = np.zeros_like(A)
+    K = np.empty((7,) + A.shape)
+
+    while t < T:
+        if progress is not None:
+            progress(t - t0, T - t0)
+        if len(Q_steps) >= max_steps:
+            raise RuntimeError(f"RK45 excedió {max_steps} pasos")
+        h = min(h, T - t)
+        K[0] = k1
+        for s in range(1, 6):
+            dA = np.tensordot(_DP_A[s], K[:s], axes=1) * h
+            K[s] = f(t + _DP_C[s] * h, A + dA)
+        A_new = A + h * np.tensordot(_DP_B, K, axes=1)
+        K[6] = f(t + h, A_new)
+        nfev += 6
+
+        err = h * np.tensordot(_DP_E, K, axes=1)
+        scale = atol + rtol * np.maximum(np.abs(A), np.abs(A_new))
+        err_norm = float(np.max(np.abs(err) / scale))
+
+        if err_norm <= 1:
+            Q_steps.append(np.tensordot(K, _DP_P, axes=(0, 0)))  # (N, 4)
+            t += h
+            A = A_new
+            k1 = K[6].copy()
+            t_steps.append(t)
+            A_steps.append(A)
+            max_error = max(max_error, err_norm)
+            error_estimate += np.abs(err)
+        else:
+            n_rejected += 1
+
+        factor = 10.0 if err_norm == 0 else min(10.0, max(0.2, 0.9 * err_norm ** -0.2))
+        h *= factor
+
+    instrument.count('edo.rk45_steps', len(Q_steps))
+    instrument.count('edo.rk45_rejected', n_rejected)
+    instrument.count('edo.rk45_evaluations', nfev * A.size)
+    return DenseSolution(params, np.array(t_steps), np.stack(A_steps, axis=1),
+                         np.array(Q_steps), nfev, n_rejected, max_error, error_estimate)
+
+
+def solve(I0, g, c0, c1, c2, r, A0, T, t0=0.0, dt=0.1, method='analytic',
+          rtol=1e-6, atol=1e-3, progress=None, return_info=False):
+    """Resuelve la EDO en la malla t0, t0 + dt, ..., T.
+
+    method='analytic' usa la solución cerrada y recurre a RK4 solo para
+    los hogares cuyo resultado no sea finito (desbordes en e^(k tau)).
+    method='rk4' fuerza la integración numérica, útil como verificación.
+    method='rk45' integra con paso adaptativo (rtol/atol) y muestrea la
+    salida densa en la malla; dt solo fija la resolución de salida.
+    Devuelve (times, A, I, C) igual que simulate_rk4; con return_info=True
+    agrega un dict de diagnóstico (para 'rk45', el de DenseSolution.info;
+    para 'analytic', cuántos hogares recurrieron a RK4).
+    """
+    if method == 'rk4':
+        result = simulate_rk4(I0, g, c0, c1, c2, r, A0, T, t0=t0, dt=dt, progress=progress)
+        return result + ({'n_steps': result[0].size - 1},) if return_info else result
+    if method not in ('analytic', 'rk45'):
+        raise ValueError(f"Método desconocido: {method}")
+
+    params = as_batch(I0, g, c0, c1, c2, r, A0)
+    n_steps = grid_steps(T, t0, dt)
+    times = np.linspace(t0, T, n_steps + 1)
+    if method == 'rk45':
+        solution = simulate_rk45(*params, T, t0=t0, rtol=rtol, atol=atol, progress=progress)
+        result = (times,) + solution.trajectories(times)
+        return result + (solution.info(),) if return_info else result
+
+    A_values, I_values, C_values = simulate_analytic(*params, times, t0=t0)
+    instrument.count('edo.analytic_points', A_values.size)
+
+    bad = ~np.isfinite(A_values).all(axis=1)
+    if bad.any():
+        _, A_bad, I_bad, C_bad = simulate_rk4(*(p[bad] for p in params), T, t0=t0, dt=dt,
+                                              progress=progress)
+        A_values[bad], I_values[bad], C_values[bad] = A_bad, I_bad, C_bad
+    if return_info:
+        return times, A_values, I_values, C_values, {'rk4_fallback': int(bad.sum())}
+    return times, A_values, I_values, C_values
@@ -0,0 +1,190 @@
+# Planilla de gastos mensuales: una fila por categoría con su gasto mínimo
+# y máximo, más una fila 'Ingreso' cuyo valor está en ambas columnas.
+# pandas se importa solo en las funciones que lo necesitan; la interfaz
+# trabaja con Table, que no depende de él, para arrancar más rápido.
+import os
+
+CATEGORY_COL = 'Categoría'
+MIN_COL = 'Gasto Mín (Bs.)'
+MAX_COL = 'Gasto Máx (Bs.)'
+REQUIRED_COLUMNS = [CATEGORY_COL, MIN_COL, MAX_COL]
+INCOME = 'Ingreso'
+DEBT = 'Deuda'  # matched case-insensitively: the sample CSV writes 'deuda'
+
+# Planilla de ejemplo del repositorio, independiente del directorio actual
+SAMPLE_CSV = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           os.pardir, 'data', 'consumo_cochabamba.csv'))
+
+
+DEFAULT_LEDGER = {
+    CATEGORY_COL: [
+        'Ingreso', 'Alimentación', 'Transporte', 'Vivienda', 'Vestimenta',
+        'Entretenimiento', 'Salud', 'Educación', 'Comunicación',
+        'Deuda', 'Otros'
+    ],
+    MIN_COL: [0, 550, 150, 750, 100, 100, 100, 50, 50, 0, 50],
+    MAX_COL: [0, 900, 300, 1250, 200, 300, 400, 200, 100, 0, 150]
+}
+
+
+class Table:
+    """Tabla mínima por columnas (listas de Python).
+
+    Cubre lo que la interfaz necesita de la planilla (leer y escribir
+    celdas, recorrer columnas) sin importar pandas; se convierte a
+    DataFrame solo al guardar.
+    """
+
+    def __init__(self, data):
+        self.data = {name: list(values) for name, values in data.items()}
+        self.columns = list(self.data)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls({str(name): df[name].tolist() for name in df.columns})
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.data)
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def column(self, name):
+        return self.data[name]
+
+    def get(self, row, name):
+        return self.data[name][row]
+
+    def set(self, row, name, value):
+        self.data[name][row] = value
+
+    def append(self, row):
+        for name in self.columns:
+            self.data[name].append(row.get(name))
+
+
+def default_table():
+    return Table(DEFAULT_LEDGER)
+
+
+def default_ledger():
+    import pandas as pd
+    return pd.DataFrame(DEFAULT_LEDGER)
+
+
+def validate_ledger(df):
+    """Comprueba las columnas y agrega la fila 'Ingreso' si falta."""
+    import pandas as pd
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        raise ValueError(
+            "El archivo CSV debe contener las columnas: 'Categoría', 'Gasto Mín (Bs.)', 'Gasto Máx (Bs.)'")
+    if INCOME not in df[CATEGORY_COL].values:
+        income_row = pd.DataFrame({CATEGORY_COL: [INCOME], MIN_COL: [0], MAX_COL: [0]})
+        df = pd.concat([income_row, df]).reset_index(drop=True)
+    return df
+
+
+def read_ledger(path):
+    import pandas as pd
+    return validate_ledger(pd.read_csv(path))
+
+
+def income_of(df):
+    return float(df.loc[df[CATEGORY_COL] == INCOME, MIN_COL].iloc[0])
+
+
+def set_income(df, income):
+    income_idx = df[df[CATEGORY_COL] == INCOME].index[0]
+    df.at[income_idx, MIN_COL] = income
+    df.at[income_idx, MAX_COL] = income
+
+
+def set_debt(df, payment):
+    """Pone el pago mensual de deudas en la fila 'Deuda' (la agrega si falta)."""
+    df[[MIN_COL, MAX_COL]] = df[[MIN_COL, MAX_COL]].astype(float)  # payments are not whole Bs.
+    is_debt = df[CATEGORY_COL].astype(str).str.lower() == DEBT.lower()
+    if not is_debt.any():
+        df.loc[len(df)] = {CATEGORY_COL: DEBT, MIN_COL: payment, MAX_COL: payment}
+        return
+    debt_idx = df[is_debt].index[0]
+    df.at[debt_idx, MIN_COL] = payment
+    df.at[debt_idx, MAX_COL] = payment
+
+
+def savings_summary(df, income=None):
+    """Totales de gasto y ahorro en los escenarios de gasto mínimo y máximo."""
+    if income is None:
+        income = income_of(df)
+    expenses_df = df[df[CATEGORY_COL] != INCOME]
+    total_min = float(expenses_df[MIN_COL].sum())
+    total_max = float(expenses_df[MAX_COL].sum())
+    return {
+        'income': float(income),
+        'total_min_expense': total_min,
+        'total_max_expense': total_max,
+        'min_savings': income - total_max,  # Scenario with maximum expenses
+        'max_savings': income - total_min,  # Scenario with minimum expenses
+    }
+
+
+class ExpenseLedger:
+    """Planilla con los totales de gasto y el ingreso mantenidos al día.
+
+    Los totales se calculan una vez en reset(); después cada edición los
+    ajusta con la diferencia entre el valor nuevo y el anterior, así que
+    summary() no vuelve a recorrer la tabla. Trabaja sobre una Table.
+    """
+
+    def __init__(self, table):
+        self.reset(table)
+
+    def reset(self, table):
+        self.table = table
+        categories = table.column(CATEGORY_COL)
+        self.income_pos = categories.index(INCOME) if INCOME in categories else None
+        lowered = [str(c).lower() for c in categories]
+        self.debt_pos = lowered.index(DEBT.lower()) if DEBT.lower() in lowered else None
+        self.income = float(table.get(self.income_pos, MIN_COL)) if self.income_pos is not None else 0.0
+        self.total_min = sum(float(v) for i, v in enumerate(table.column(MIN_COL)) if i != self.income_pos)
+        self.total_max = sum(float(v) for i, v in enumerate(table.column(MAX_COL)) if i != self.income_pos)
+
+    def set_expense(self, row, new_min, new_max):
+        """Cambia el gasto de la fila `row` (posición) y ajusta los totales."""
+        if row == self.income_pos:
+            self.set_income(new_min)
+            return
+        old_min = float(self.table.get(row, MIN_COL))
+        old_max = float(self.table.get(row, MAX_COL))
+        self.table.set(row, MIN_COL, new_min)
+        self.table.set(row, MAX_COL, new_max)
+        self.total_min += new_min - old_min
+        self.total_max += new_max - old_max
+
+    def set_income(self, income):
+        if self.income_pos is not None:
+            self.table.set(self.income_pos, MIN_COL, income)
+            self.table.set(self.income_pos, MAX_COL, income)
+        self.income = float(income)
+
+    def set_debt(self, payment):
+        """Pago mensual de deudas en la fila 'Deuda' (se agrega si falta)."""
+        if self.debt_pos is None:
+            self.table.append({CATEGORY_COL: DEBT, MIN_COL: 0.0, MAX_COL: 0.0})
+            self.debt_pos = len(self.table) - 1
+        self.set_expense(self.debt_pos, payment, payment)
+
+    def ranges(self):
+        """(mins, maxs) de las categorías de gasto, sin la fila 'Ingreso'."""
+        rows = [i for i in range(len(self.table)) if i != self.income_pos]
+        mins, maxs = self.table.column(MIN_COL), self.table.column(MAX_COL)
+        return [float(mins[i]) for i in rows], [float(maxs[i]) for i in rows]
+
+    def summary(self):
+        return {
+            'income': self.income,
+            'total_min_expense': self.total_min,
+            'total_max_expense': self.total_max,
+            'min_savings': self.income - self.total_max,  # Scenario with maximum expenses
+            'max_savings': self.income - self.total_min,  # Scenario with minimum expenses
+        }
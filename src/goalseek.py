@@ -0,0 +1,127 @@
+import numpy as np
+
+import edo
+from annuity import future_value
+
+# Búsqueda de objetivo: qué valor de un parámetro lleva el ahorro final a
+# una meta dada. Todo es vectorizado: target y los parámetros pueden ser
+# arrays con un valor por hogar.
+# - Anualidad: P y n_months tienen fórmula cerrada; r_annual se busca con
+#   regula falsi (Illinois), ya que VF crece con la tasa.
+# - EDO: A(T) es afín en I0, c0, c1 y A0, así que esos se despejan con dos
+#   evaluaciones de la solución analítica; g, c2 y r se buscan con regula
+#   falsi dentro de un intervalo.
+# Los hogares sin solución en el intervalo (o con una meta inalcanzable,
+# p.ej. una propensión al consumo fuera de [0, 1]) quedan en NaN.
+
+VF_UNKNOWNS = ('P', 'r_annual', 'n_months')
+EDO_UNKNOWNS = edo.PARAM_NAMES
+AFFINE_PARAMS = ('I0', 'c0', 'c1', 'A0')
+# Valores con sentido económico de las incógnitas afines
+DOMAINS = {
+    'I0': lambda x: x > 0,
+    'c1': lambda x: (x >= 0) & (x <= 1),
+}
+BRACKETS = {
+    'r_annual': (-0.99, 1.0),
+    'g': (-0.5, 0.5),
+    'c2': (-1.0, 1.0),
+    'r': (-0.5, 0.5),
+}
+
+
+def bracket_solve(f, lo, hi, xtol=1e-10, ftol=1e-6, max_iter=100):
+    """Raíz de f (vectorizada) en [lo, hi] por regula falsi (Illinois).
+
+    f recibe un array x y devuelve f(x) elemento a elemento. Donde f no
+    cambia de signo entre lo y hi el resultado es NaN.
+    """
+    a, b = (np.array(v, dtype=float) for v in np.broadcast_arrays(lo, hi))
+    fa, fb = f(a), f(b)
+    a, b, fa, fb = (np.array(v, dtype=float) for v in np.broadcast_arrays(a, b, fa, fb))
+    valid = np.isfinite(fa) & np.isfinite(fb) & (np.sign(fa) * np.sign(fb) <= 0)
+    side = np.zeros(a.shape, dtype=int)
+    x = np.where(fa == 0, a, b)
+    active = valid & (fa != 0) & (fb != 0)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        denom = np.where(fb != fa, fb - fa, 1.0)
+        x_new = np.where(fb != fa, (a * fb - b * fa) / denom, (a + b) / 2)
+        x = np.where(active, x_new, x)
+        fx = f(x)
+        # Root lies in [a, x]: x replaces b; in [x, b]: x replaces a
+        left = active & (fx * fb > 0)
+        right = active & (fx * fa > 0)
+        fa = np.where(left & (side == -1), fa / 2, fa)
+        fb = np.where(right & (side == 1), fb / 2, fb)
+        b, fb = np.where(left, x, b), np.where(left, fx, fb)
+        a, fa = np.where(right, x, a), np.where(right, fx, fa)
+        side = np.where(left, -1, np.where(right, 1, side))
+        done = (fx == 0) | (np.abs(b - a) <= xtol * (1 + np.abs(x))) | (np.abs(fx) <= ftol)
+        active &= ~done
+    return np.where(valid, x, np.nan)
+
+
+def solve_vf(target, unknown, P=None, r_annual=None, n_months=None, lo=None, hi=None):
+    """Valor de `unknown` ('P', 'r_annual' o 'n_months') con VF = target.
+
+    n_months se redondea hacia arriba: primer mes en que VF >= target.
+    """
+    target = np.asarray(target, dtype=float)
+    if unknown == 'P':
+        return target / future_value(1.0, r_annual, n_months)
+    if unknown == 'n_months':
+        P = np.asarray(P, dtype=float)
+        r_monthly = np.asarray(r_annual, dtype=float) / 12
+        zero = r_monthly == 0
+        safe_r = np.where(zero, 1.0, r_monthly)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            months = np.where(zero, target / P,
+                              np.log1p(target * safe_r / P) / np.log1p(safe_r))
+            months = np.where(np.isfinite(months) & (months >= 0), np.ceil(months - 1e-9), np.nan)
+        return months
+    if unknown == 'r_annual':
+        lo, hi = BRACKETS['r_annual'] if lo is None else (lo, hi)
+        return bracket_solve(lambda r: future_value(P, r, n_months) - target,
+                             lo, hi)
+    raise ValueError(f"Incógnita desconocida: {unknown}")
+
+
+def final_savings(params, T, t0=0.0):
+    """A(T) de la solución analítica para los parámetros dados (arrays)."""
+    A_values, _, _ = edo.simulate_analytic(*(params[name] for name in edo.PARAM_NAMES),
+                                           [T], t0=t0)
+    return A_values[:, 0]
+
+
+def solve_edo(target, unknown, params, T, t0=0.0, lo=None, hi=None):
+    """Valor del parámetro `unknown` del modelo EDO con A(T) = target.
+
+    params es un dict con los demás parámetros (escalares o arrays).
+    """
+    if unknown not in EDO_UNKNOWNS:
+        raise ValueError(f"Incógnita desconocida: {unknown}")
+    target = np.asarray(target, dtype=float)
+    batch = dict(zip(edo.PARAM_NAMES, edo.as_batch(
+        *(params.get(name, 0.0) if name != unknown else 0.0 for name in edo.PARAM_NAMES))))
+    n = max(batch['I0'].size, target.size)
+    batch = {name: np.broadcast_to(values, n) for name, values in batch.items()}
+    target = np.broadcast_to(target, n)
+
+    def at(value):
+        trial = dict(batch)
+        trial[unknown] = np.broadcast_to(value, n)
+        return final_savings(trial, T, t0)
+
+    if unknown in AFFINE_PARAMS:
+        base = at(0.0)
+        slope = at(1.0) - base
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = np.where(slope != 0, (target - base) / slope, np.nan)
+            if unknown in DOMAINS:
+                value = np.where(DOMAINS[unknown](value), value, np.nan)
+        return value
+    lo, hi = BRACKETS[unknown] if lo is None else (lo, hi)
+    return bracket_solve(lambda value: at(value) - target,
+                         np.broadcast_to(float(lo), n), float(hi))
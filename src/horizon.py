@@ -0,0 +1,200 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import edo
+import instrument
+from annuity import future_value, yearly_curve
+from cache import make_key
+
+# Extensión incremental del horizonte de simulación.
+# Para cada conjunto de parámetros sin contar el horizonte (T en la EDO,
+# n_months en la anualidad) se guarda la trayectoria calculada hasta ahora
+# en arrays que crecen por bloques. Si el horizonte pedido es mayor, solo
+# se integra el tramo nuevo desde el último punto guardado (t, A) y se
+# agrega al final; si es menor o igual, se devuelve una vista del tramo
+# ya calculado. En la EDO solo se guardan horizontes sobre la malla
+# global t0 + i dt, la misma de una corrida completa, así que los pasos
+# nuevos son los de esa corrida: la solución analítica y RK4 continúan
+# exactamente desde (t, A, I(t)). Un horizonte fuera de la malla se
+# calcula completo sin guardarse. El lock cubre solo la búsqueda y el
+# guardado; la integración corre fuera, así que una consulta no espera a
+# otra y, si dos extienden la misma entrada, se agregan solo los puntos
+# que falten.
+
+HORIZON_PARAMS = {'edo': 'T', 'vf': 'n_months'}
+
+
+class GrowableArray:
+    """Array (filas, n) que crece por el último eje, duplicando la capacidad.
+
+    Las vistas devueltas por view() siguen siendo válidas después de
+    append(): los valores ya escritos no cambian.
+    """
+
+    def __init__(self, rows, capacity=256):
+        self.buffer = np.empty((rows, capacity))
+        self.size = 0
+
+    def append(self, block):
+        block = np.asarray(block, dtype=float).reshape(self.buffer.shape[0], -1)
+        needed = self.size + block.shape[1]
+        if needed > self.buffer.shape[1]:
+            grown = np.empty((self.buffer.shape[0], max(needed, 2 * self.buffer.shape[1])))
+            grown[:, :self.size] = self.buffer[:, :self.size]
+            self.buffer = grown
+        self.buffer[:, self.size:needed] = block
+        self.size = needed
+
+    def view(self, stop=None):
+        return self.buffer[:, :self.size if stop is None else stop]
+
+
+class _Trajectory:
+    # Times plus one GrowableArray per output, extended together
+    def __init__(self, rows, names):
+        self.times = GrowableArray(1)
+        self.arrays = {name: GrowableArray(rows) for name in names}
+
+    def append(self, times, **blocks):
+        self.times.append(times)
+        for name, block in blocks.items():
+            self.arrays[name].append(block)
+
+    def result(self, stop, names):
+        # Read-only views: callers share the buffers with later extensions
+        views = (self.times.view(stop)[0],) + tuple(self.arrays[name].view(stop) for name in names)
+        for view in views:
+            view.setflags(write=False)
+        return views
+
+
+class HorizonCache:
+    """Trayectorias por parámetros (sin el horizonte), extendidas a pedido.
+
+    Guarda hasta max_entries conjuntos de parámetros con LRU. Cuenta
+    reutilizaciones (hits), extensiones y cálculos completos (misses).
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, kind, params, settings):
+        fixed = {k: v for k, v in params.items() if k != HORIZON_PARAMS[kind]}
+        return make_key(f'{kind}-horizon', fixed, **settings)
+
+    def _store(self, key, trajectory):
+        self.entries[key] = trajectory
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _count(self, name):
+        setattr(self, name, getattr(self, name) + 1)
+        instrument.count(f'horizon.{name}')
+
+    def _lookup(self, key, size):
+        # (hit, trajectory, start): a stored trajectory with at least `size`
+        # points is a hit; otherwise the points from `start` on are missing
+        with self._lock:
+            stored = self.entries.get(key)
+            if stored is not None and stored.times.size >= size:
+                self.entries.move_to_end(key)
+                self._count('hits')
+                return True, stored, size
+            self._count('misses' if stored is None else 'extensions')
+            return False, stored, 0 if stored is None else stored.times.size
+
+    def _merge(self, key, stored, start, size, names, times, blocks):
+        # Append the points start..size-1 computed outside the lock, except
+        # those another thread appended meanwhile, and return the first size
+        with self._lock:
+            trajectory = self.entries.get(key, stored)
+            if trajectory is None:
+                trajectory = _Trajectory(1, names)
+            skip = trajectory.times.size - start
+            if skip >= 0:
+                if skip < times.size:
+                    trajectory.append(times[skip:], **{name: block[:, skip:]
+                                                       for name, block in zip(names, blocks)})
+                self._store(key, trajectory)
+                return trajectory.result(size, names)
+        # The entry was replaced by a shorter trajectory: keep it, answer from ours
+        prefix = stored.result(start, names)
+        return (np.concatenate([prefix[0], times]),) + tuple(
+            np.concatenate([old, new], axis=-1) for old, new in zip(prefix[1:], blocks))
+
+    def edo(self, params, settings, progress=None):
+        """(times, A, I, C) de la EDO hasta params['T'], como edo.solve para un hogar."""
+        names = ('A', 'I', 'C')
+        p = params
+        args = [p['I0'], p['g'], p['c0'], p['c1'], p['c2'], p['r']]
+        T = float(p['T'])
+        t0, dt = float(settings.get('t0', 0.0)), float(settings.get('dt', 0.1))
+        solver = {k: v for k, v in settings.items() if k != 't0'}
+        n_steps = edo.grid_steps(T, t0, dt)
+        if not np.isclose(t0 + n_steps * dt, T, rtol=1e-12, atol=1e-9):
+            # Off the global grid: a full run, neither stored nor extended
+            self._count('misses')
+            return edo.solve(*args, p['A0'], T, t0=t0, progress=progress, **solver)
+
+        key = self._key('edo', params, settings)
+        hit, stored, start = self._lookup(key, n_steps + 1)
+        if hit:
+            return stored.result(n_steps + 1, names)
+        if stored is None:
+            _, *blocks = edo.solve(*args, p['A0'], T, t0=t0, progress=progress, **solver)
+        else:
+            # Only the new steps, from the last stored grid point (the first
+            # point of the segment repeats it)
+            A_end = stored.arrays['A'].view(start)[:, -1]
+            _, *blocks = edo.solve(*args, A_end, T, t0=t0 + (start - 1) * dt,
+                                   progress=progress, **solver)
+            blocks = [block[:, 1:] for block in blocks]
+        times = t0 + dt * np.arange(start, n_steps + 1)
+        return self._merge(key, stored, start, n_steps + 1, names, times, blocks)
+
+    def vf(self, params):
+        """(FV, times, curva) de la anualidad con la curva mes a mes hasta n_months."""
+        P, r_annual, n_months = params['P'], params['r_annual'], int(params['n_months'])
+        key = self._key('vf', params, {})
+        hit, stored, start = self._lookup(key, n_months + 1)
+        if hit:
+            times, curve = stored.result(n_months + 1, ('curve',))
+        else:
+            times = np.arange(start, n_months + 1) / 12
+            curve = yearly_curve(P, r_annual, times).reshape(1, -1)
+            times, curve = self._merge(key, stored, start, n_months + 1, ('curve',), times, [curve])
+        return future_value(P, r_annual, n_months), times, curve[0]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
+if __name__ == "__main__":
+    import time
+
+    params = {'I0': 2061, 'g': 0.05, 'c0': 50, 'c1': 0.9, 'c2': 0.1, 'r': 0.03, 'A0': 161}
+    edo.solve(*params.values(), 0.1, dt=0.1, method='rk4')  # compile the Numba kernel, if any
+    for method, dt in (('analytic', 0.001), ('rk4', 0.001), ('rk45', 0.001)):
+        settings = {'t0': 0, 'dt': dt, 'method': method}
+        horizons = HorizonCache()
+        start = time.perf_counter()
+        horizons.edo(dict(params, T=10), settings)
+        short = time.perf_counter() - start
+        start = time.perf_counter()
+        times, A_values, _, _ = horizons.edo(dict(params, T=30), settings)
+        extended = time.perf_counter() - start
+        start = time.perf_counter()
+        full_times, full_A, _, _ = edo.solve(*params.values(), 30, dt=dt, method=method)
+        full = time.perf_counter() - start
+        print(f"{method}: T=10 {short * 1000:.1f} ms, extender a 30 {extended * 1000:.1f} ms, "
+              f"desde 0 {full * 1000:.1f} ms; puntos {times.size}/{full_times.size}, "
+              f"diferencia máx {np.abs(A_values - full_A).max():.2e}")
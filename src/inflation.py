@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from schedules import grid_lookup
+
+# Valores reales (en bolivianos del instante inicial) a partir de las
+# trayectorias nominales. El factor de descuento para una inflación anual
+# constante π es 1 / (1 + π)^t con t en años; para una serie mensual de
+# inflación (columna 'inflacion' de schedules) es el producto acumulado de
+# 1 / (1 + π_m / 12). Las tablas de factores se calculan una vez por
+# (inflación, malla de tiempos) y se guardan en un LRU, así que deflactar
+# una trayectoria es un solo producto de arrays y se pueden comparar
+# muchas hipótesis de inflación sin volver a integrar. Solo se guardan
+# las mallas compartidas por las trayectorias; los factores de tiempos
+# propios de cada hogar (su plazo) se calculan directamente, porque no
+# se reutilizan y un lote grande retendría tablas enormes en el LRU.
+
+SERIES_LABEL = 'serie'
+
+
+class DiscountTables:
+    """Factores de descuento por (inflación, malla de tiempos), con LRU."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        factors = np.asarray(build())
+        factors.flags.writeable = False  # shared by every caller
+        self.entries[key] = factors
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return factors
+
+    def get(self, rate, times, cache=True):
+        """1 / (1 + rate)^times, con la forma de times; sin pasar por el LRU si cache=False."""
+        times = np.asarray(times, dtype=float)
+
+        def build():
+            return np.exp(-np.log1p(float(rate)) * times)
+
+        if not cache:
+            return build()
+        return self._lookup((float(rate), times.shape, times.tobytes()), build)
+
+    def get_series(self, inflation, times, t_start=0.0, cache=True):
+        """Factores de una serie mensual de inflación anual, en cada instante de times.
+
+        Dentro de cada mes la inflación se acumula de forma continua.
+        """
+        inflation = np.asarray(inflation, dtype=float)
+        times = np.asarray(times, dtype=float)
+
+        def build():
+            monthly = np.log1p(inflation / 12)
+            # log of the price index at the start of each month, then the partial month
+            start = np.concatenate(([0.0], np.cumsum(monthly)))
+            idx = grid_lookup(inflation.size, times, t_start)
+            elapsed = np.maximum((times - t_start) * 12 - idx, 0.0)
+            return np.exp(-(start[idx] + elapsed * monthly[idx]))
+
+        if not cache:
+            return build()
+        return self._lookup((SERIES_LABEL, inflation.tobytes(), float(t_start), times.shape,
+                             times.tobytes()), build)
+
+    def clear(self):
+        self.entries.clear()
+
+
+TABLES = DiscountTables()
+
+
+def label(rate):
+    """Sufijo de columna para una hipótesis: 'real_0.04' o 'real_serie'."""
+    return f'real_{SERIES_LABEL}' if isinstance(rate, str) else f'real_{rate:g}'
+
+
+def deflate(values, times, rates, inflation_series=None, tables=TABLES, grid=True):
+    """Valores reales de `values` para cada inflación anual de `rates`.
+
+    times es la malla (años) del último eje de values; con grid=False es
+    un array con la forma de values (p.ej. el plazo de cada hogar) y sus
+    factores no se guardan en tables. Con inflation_series se agrega la
+    hipótesis de la serie mensual. Devuelve {label: array}.
+    """
+    values = np.asarray(values, dtype=float)
+    real = {label(rate): values * tables.get(rate, times, cache=grid) for rate in rates}
+    if inflation_series is not None:
+        real[label(SERIES_LABEL)] = values * tables.get_series(inflation_series, times, cache=grid)
+    return real
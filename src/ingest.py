@@ -0,0 +1,66 @@
+import glob
+import os
+
+import pandas as pd
+
+from expenses import CATEGORY_COL, INCOME, MAX_COL, MIN_COL
+
+# Lectura masiva de planillas de gastos.
+# Acepta un CSV grande con una columna household_id (una planilla por hogar
+# repartida en muchas filas) o un directorio con un CSV por hogar. Los
+# archivos se leen por bloques y solo se acumulan sumas por hogar, así que
+# la memoria depende del número de hogares y no del número de filas.
+
+HOUSEHOLD_COL = 'household_id'
+TOTAL_COLUMNS = ['income', 'total_min_expense', 'total_max_expense']
+
+
+def _chunk_totals(chunk, household):
+    # Case-insensitive, like montecarlo.expense_ranges
+    is_income = chunk[CATEGORY_COL].astype(str).str.lower() == INCOME.lower()
+    part = pd.DataFrame({
+        HOUSEHOLD_COL: household if household is not None else chunk[HOUSEHOLD_COL],
+        'income': chunk[MIN_COL].where(is_income, 0.0),
+        'total_min_expense': chunk[MIN_COL].where(~is_income, 0.0),
+        'total_max_expense': chunk[MAX_COL].where(~is_income, 0.0),
+    }, index=chunk.index)
+    return part.groupby(HOUSEHOLD_COL, sort=False)[TOTAL_COLUMNS].sum()
+
+
+def _read_chunks(path, chunksize):
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [CATEGORY_COL, MIN_COL, MAX_COL]
+    has_household = HOUSEHOLD_COL in header
+    if has_household:
+        usecols.append(HOUSEHOLD_COL)
+    reader = pd.read_csv(path, usecols=usecols, chunksize=chunksize,
+                         dtype={MIN_COL: 'float64', MAX_COL: 'float64'})
+    return has_household, reader
+
+
+def household_totals(path, chunksize=500000):
+    """Ingreso, gasto mínimo/máximo y ahorros por hogar.
+
+    path puede ser un CSV con columna household_id o un directorio de CSV;
+    en un directorio, los archivos sin esa columna son un hogar cuyo id es
+    el nombre del archivo.
+    """
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, '*.csv')))
+    else:
+        files = [path]
+
+    totals = None
+    for file in files:
+        has_household, reader = _read_chunks(file, chunksize)
+        household = None if has_household else os.path.splitext(os.path.basename(file))[0]
+        for chunk in reader:
+            part = _chunk_totals(chunk, household)
+            totals = part if totals is None else totals.add(part, fill_value=0.0)
+
+    if totals is None:
+        totals = pd.DataFrame(columns=TOTAL_COLUMNS, dtype='float64')
+        totals.index.name = HOUSEHOLD_COL
+    totals['min_savings'] = totals['income'] - totals['total_max_expense']
+    totals['max_savings'] = totals['income'] - totals['total_min_expense']
+    return totals.reset_index()
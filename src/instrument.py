@@ -0,0 +1,150 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Instrumentación opcional de las rutas calientes.
+# Desactivada por defecto: timed() y count() no hacen nada hasta que se
+# llama a enable(), lo que ocurre al importar el módulo si está definida la
+# variable CALCULADORA_INSTRUMENT, o con --instrument en interfaz.py y
+# calculadora.py. Registra por operación llamadas, tiempo total y máximo,
+# y contadores (pasos RK4, evaluaciones, filas cargadas, redibujados).
+# Con CALCULADORA_PROFILE=archivo.prof (o --profile) además corre cProfile
+# y guarda sus estadísticas al salir; el archivo se abre con pstats,
+# snakeviz o flameprof para obtener un flamegraph. cProfile solo ve el
+# hilo que lo activó: las simulaciones de la interfaz corren en hilos
+# aparte, así que para perfilarlas conviene usar calculadora.py.
+
+ENV_VAR = 'CALCULADORA_INSTRUMENT'
+PROFILE_ENV_VAR = 'CALCULADORA_PROFILE'
+
+enabled = False
+_lock = threading.Lock()
+_timings = {}    # name -> [calls, total seconds, max seconds]
+_counters = {}   # name -> total
+_profiler = None
+_profile_path = None
+
+
+def enable(profile_path=None, report_at_exit=True):
+    """Activa el registro; con profile_path también corre cProfile."""
+    global enabled, _profiler, _profile_path
+    if not enabled and report_at_exit:
+        atexit.register(_at_exit)
+    enabled = True
+    if profile_path and _profiler is None:
+        _profile_path = profile_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def record(name, seconds):
+    if not enabled:
+        return
+    with _lock:
+        entry = _timings.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+def count(name, n=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def span(name):
+    """Mide el bloque `with span(name):` si la instrumentación está activa."""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name=None):
+    """Decorador que mide cada llamada a la función."""
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        return {
+            'timings': {name: {'calls': calls, 'total_s': total, 'max_s': peak,
+                               'mean_s': total / calls}
+                        for name, (calls, total, peak) in _timings.items()},
+            'counters': dict(_counters),
+        }
+
+
+def report():
+    data = snapshot()
+    lines = [f"{'Operación':<32}{'llamadas':>10}{'total ms':>12}{'media ms':>12}{'máx ms':>12}"]
+    for name, t in sorted(data['timings'].items(), key=lambda item: -item[1]['total_s']):
+        lines.append(f"{name:<32}{t['calls']:>10}{t['total_s'] * 1000:>12.2f}"
+                     f"{t['mean_s'] * 1000:>12.2f}{t['max_s'] * 1000:>12.2f}")
+    if data['counters']:
+        lines.append('')
+        lines.append(f"{'Contador':<32}{'total':>10}")
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"{name:<32}{value:>10}")
+    return '\n'.join(lines)
+
+
+def dump(path):
+    """Guarda snapshot() en JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def stop_profile():
+    """Detiene cProfile y guarda sus estadísticas; devuelve la ruta o None."""
+    global _profiler
+    if _profiler is None:
+        return None
+    _profiler.disable()
+    _profiler.dump_stats(_profile_path)
+    _profiler = None
+    return _profile_path
+
+
+def _at_exit():
+    path = stop_profile()
+    print(report(), file=sys.stderr)
+    if path:
+        print(f"Perfil cProfile guardado en {path}", file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR) or os.environ.get(PROFILE_ENV_VAR):
+    enable(os.environ.get(PROFILE_ENV_VAR))
@@ -1,17 +1,43 @@
+import time
+
+# Taken before the other imports so report_timings can show their cost;
+# the noqa keeps the imports below from counting as E402
+_START = time.perf_counter()  # noqa: E402
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import argparse
+import math
 import os
+import sys
+import warnings
+from collections import OrderedDict
+
+import expenses
+import instrument
+from worker import BackgroundTask, poll
+from table_view import VirtualTable
+
+# numpy, pandas y matplotlib (y los módulos que dependen de ellos: annuity,
+# edo, cache, storage, plots) se importan en el primer uso, no al arrancar,
+# para que la ventana aparezca cuanto antes.
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib')
 
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
 class FinancialSimulatorApp(ctk.CTk):
+    # Goal-seek options: label shown in the menu -> parameter solved for
+    VF_GOALS = {"Aporte mensual": 'P', "Tasa anual": 'r_annual', "Plazo (meses)": 'n_months'}
+    EDO_GOALS = {"Propensión al consumo (c1)": 'c1', "Ahorro inicial (A0)": 'A0',
+                 "Ingreso inicial (I0)": 'I0', "Tasa de rendimiento (r)": 'r'}
+    # Random paths per model in the Monte Carlo fan chart
+    FAN_PATHS = 20000
+    # Expense scenario distributions kept for ledgers seen recently
+    SCENARIO_RESULTS = 32
+    
     def __init__(self):
         super().__init__()
         
@@ -69,24 +95,18 @@ class FinancialSimulatorApp(ctk.CTk):
         self.scaling_option.grid(row=8, column=0, padx=20, pady=(10, 20))
         self.scaling_option.set("100%")
         
-        # Initialize frames
+        # Initialize frames (built on first visit, then reused)
         self.vf_frame = None
         self.edo_frame = None
         self.expenses_frame = None
         self.results_frame = None
+        self.frames = {}
         
         # Initialize data storage
         self.income = 0
-        self.expenses_data = {
-            'Categoría': [
-                'Ingreso', 'Alimentación', 'Transporte', 'Vivienda', 'Vestimenta',
-                'Entretenimiento', 'Salud', 'Educación', 'Comunicación', 
-                'Deuda', 'Otros'
-            ],
-            'Gasto Mín (Bs.)': [0, 550, 150, 750, 100, 100, 100, 50, 50, 0, 50],
-            'Gasto Máx (Bs.)': [0, 900, 300, 1250, 200, 300, 400, 200, 100, 0, 150]
-        }
-        self.df_expenses = pd.DataFrame(self.expenses_data)
+        self.df_expenses = expenses.default_table()
+        self.ledger = expenses.ExpenseLedger(self.df_expenses)
+        self.debt_payments = None  # Monthly payment of the loaded loans (month 1 first)
         
         # VF parameters
         self.vf_params = {
@@ -106,10 +126,44 @@ class FinancialSimulatorApp(ctk.CTk):
             'A0': 161,    # Ahorro inicial
             'T': 10       # Tiempo total (años)
         }
+        self.edo_method = 'analytic'  # 'analytic', 'rk4' o 'rk45'
+        self.edo_rtol = 1e-6          # Tolerancias del integrador adaptativo
+        self.edo_atol = 1e-3
+        
+        # Simulations running in background threads, by name
+        self.tasks = {}
+        
+        # Plot panels, created on first use and updated in place
+        self.edo_plot = None
+        self.comparison_plot = None
+        self.fan_plot = None
+        self.scenario_results = OrderedDict()  # (mins, maxs, income) -> scenarios.run result
+        
+        # Cache of simulation results (memory LRU + files on disk), created on first use
+        self._results_cache = None
+        
+        # Trajectories per parameter set, extended when only T / months grow
+        self._horizon_cache = None
         
         # Show VF frame by default
         self.show_vf_frame()
 
+    @property
+    def results_cache(self):
+        if self._results_cache is None:
+            from cache import ResultCache
+            self._results_cache = ResultCache(
+                max_bytes=64 * 2**20,
+                path=os.path.join(os.path.expanduser("~"), ".cache", "calculadora-ahorro"))
+        return self._results_cache
+
+    @property
+    def horizon_cache(self):
+        if self._horizon_cache is None:
+            from horizon import HorizonCache
+            self._horizon_cache = HorizonCache()
+        return self._horizon_cache
+
     def change_appearance_mode(self, new_appearance_mode):
         ctk.set_appearance_mode(new_appearance_mode)
 
@@ -117,16 +171,31 @@ class FinancialSimulatorApp(ctk.CTk):
         new_scaling_float = int(new_scaling.replace("%", "")) / 100
         ctk.set_widget_scaling(new_scaling_float)
     
-    def clear_main_frame(self):
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+    def show_frame(self, name, build, refresh=None):
+        # Hide the current view and show `name`, building it on first visit
+        for frame in self.frames.values():
+            frame.pack_forget()
+        if name not in self.frames:
+            self.frames[name] = build()
+        self.frames[name].pack(fill="both", expand=True, padx=10, pady=10)
+        if refresh is not None:
+            refresh()
     
     def show_vf_frame(self):
-        self.clear_main_frame()
-        
+        self.show_frame('vf', self.build_vf_frame, self.refresh_vf_frame)
+    
+    def show_edo_frame(self):
+        self.show_frame('edo', self.build_edo_frame)
+    
+    def show_expenses_frame(self):
+        self.show_frame('expenses', self.build_expenses_frame)
+    
+    def show_results_frame(self):
+        self.show_frame('results', self.build_results_frame)
+    
+    def build_vf_frame(self):
         # Create scrollable frame
         self.vf_frame = ctk.CTkScrollableFrame(self.main_frame)
-        self.vf_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Title
         title_label = ctk.CTkLabel(self.vf_frame, text="Cálculo de Valor Futuro (VF)", 
@@ -190,6 +259,10 @@ class FinancialSimulatorApp(ctk.CTk):
                                        command=self.calculate_vf)
         calculate_button.pack(pady=20)
         
+        # Goal seek: which contribution, rate or term reaches a target value
+        self.vf_goal_entry, self.vf_goal_option, self.vf_goal_label = self.create_goal_row(
+            params_frame, list(self.VF_GOALS), self.seek_vf_goal)
+        
         # Results section
         results_frame = ctk.CTkFrame(self.vf_frame)
         results_frame.pack(fill="x", padx=10, pady=(20, 10))
@@ -210,17 +283,17 @@ class FinancialSimulatorApp(ctk.CTk):
         self.interest_earned_label = ctk.CTkLabel(results_frame, text="")
         self.interest_earned_label.pack(pady=5)
         
+        return self.vf_frame
+    
+    def refresh_vf_frame(self):
         # Update income entry with current value
-        if self.df_expenses['Gasto Mín (Bs.)'][0] > 0:
+        if self.df_expenses.get(0, 'Gasto Mín (Bs.)') > 0:
             self.income_entry.delete(0, "end")
-            self.income_entry.insert(0, str(self.df_expenses['Gasto Mín (Bs.)'][0]))
+            self.income_entry.insert(0, str(self.df_expenses.get(0, 'Gasto Mín (Bs.)')))
     
-    def show_edo_frame(self):
-        self.clear_main_frame()
-        
+    def build_edo_frame(self):
         # Create scrollable frame
         self.edo_frame = ctk.CTkScrollableFrame(self.main_frame)
-        self.edo_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Title
         title_label = ctk.CTkLabel(self.edo_frame, text="Simulación de Modelo EDO", 
@@ -286,7 +359,14 @@ class FinancialSimulatorApp(ctk.CTk):
         # Simulate button
         simulate_button = ctk.CTkButton(params_frame, text="Simular Modelo EDO", 
                                       command=self.simulate_edo)
-        simulate_button.pack(pady=20)
+        simulate_button.pack(pady=(20, 10))
+        
+        # Progress and cancel
+        self.edo_progress_bar, self.edo_cancel_button = self.create_progress_row(params_frame)
+        
+        # Goal seek on one of the model parameters
+        self.edo_goal_entry, self.edo_goal_option, self.edo_goal_label = self.create_goal_row(
+            params_frame, list(self.EDO_GOALS), self.seek_edo_goal)
         
         # Results frame for simulation
         self.edo_results_frame = ctk.CTkFrame(self.edo_frame)
@@ -302,13 +382,12 @@ class FinancialSimulatorApp(ctk.CTk):
         # Frame for the graph
         self.graph_frame = ctk.CTkFrame(self.edo_frame)
         self.graph_frame.pack(fill="both", padx=10, pady=10, expand=True)
-    
-    def show_expenses_frame(self):
-        self.clear_main_frame()
         
+        return self.edo_frame
+    
+    def build_expenses_frame(self):
         # Create scrollable frame
         self.expenses_frame = ctk.CTkScrollableFrame(self.main_frame)
-        self.expenses_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Title
         title_label = ctk.CTkLabel(self.expenses_frame, text="Gestión de Gastos", 
@@ -328,7 +407,8 @@ class FinancialSimulatorApp(ctk.CTk):
         
         self.expenses_income_entry = ctk.CTkEntry(income_frame, width=150)
         self.expenses_income_entry.pack(side="left", padx=(0, 10))
-        self.expenses_income_entry.insert(0, str(self.df_expenses['Gasto Mín (Bs.)'][0]))
+        self.expenses_income_entry.insert(0, str(self.df_expenses.get(0, 'Gasto Mín (Bs.)')))
+        self.expenses_income_entry.bind("<KeyRelease>", self.on_income_typed)
         
         # Load and save buttons
         load_csv_button = ctk.CTkButton(buttons_frame, text="Cargar CSV", 
@@ -339,6 +419,10 @@ class FinancialSimulatorApp(ctk.CTk):
                                       command=self.save_expenses_csv)
         save_csv_button.pack(side="left", padx=10, pady=10)
         
+        loans_button = ctk.CTkButton(buttons_frame, text="Cargar préstamos", 
+                                   command=self.load_loans)
+        loans_button.pack(side="left", padx=10, pady=10)
+        
         calculate_button = ctk.CTkButton(buttons_frame, text="Calcular Ahorros", 
                                        command=self.calculate_savings)
         calculate_button.pack(side="right", padx=10, pady=10)
@@ -347,14 +431,19 @@ class FinancialSimulatorApp(ctk.CTk):
         table_frame = ctk.CTkFrame(self.expenses_frame)
         table_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Create Treeview for expenses
-        columns = ("Categoría", "Gasto Mín (Bs.)", "Gasto Máx (Bs.)")
-        self.expenses_tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        # Filter by category
+        filter_frame = ctk.CTkFrame(table_frame, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ctk.CTkLabel(filter_frame, text="Filtrar categoría:").pack(side="left", padx=(0, 10))
+        self.expenses_filter_entry = ctk.CTkEntry(filter_frame, width=200)
+        self.expenses_filter_entry.pack(side="left")
+        self.expenses_filter_entry.bind(
+            "<KeyRelease>", lambda event: self.expenses_table.set_filter(self.expenses_filter_entry.get()))
         
-        # Define headings
-        for col in columns:
-            self.expenses_tree.heading(col, text=col)
-            self.expenses_tree.column(col, width=150, anchor="center")
+        # Create virtualized Treeview for expenses (click a heading to sort)
+        columns = ("Categoría", "Gasto Mín (Bs.)", "Gasto Máx (Bs.)")
+        self.expenses_table = VirtualTable(table_frame, columns, height=15)
+        self.expenses_tree = self.expenses_table.tree
         
         # Set style for dark mode compatibility
         style = ttk.Style()
@@ -365,11 +454,7 @@ class FinancialSimulatorApp(ctk.CTk):
                         fieldbackground="#2a2d2e")
         style.map('Treeview', background=[('selected', '#22559b')])
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.expenses_tree.yview)
-        self.expenses_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
-        self.expenses_tree.pack(fill="both", expand=True, padx=10, pady=10)
+        self.expenses_table.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Populate treeview with data
         self.update_expenses_table()
@@ -400,13 +485,18 @@ class FinancialSimulatorApp(ctk.CTk):
         
         self.max_savings_label = ctk.CTkLabel(self.savings_results_frame, text="")
         self.max_savings_label.pack(pady=5)
-    
-    def show_results_frame(self):
-        self.clear_main_frame()
         
+        self.scenarios_label = ctk.CTkLabel(self.savings_results_frame, text="")
+        self.scenarios_label.pack(pady=5)
+        
+        self.debt_label = ctk.CTkLabel(self.savings_results_frame, text="")
+        self.debt_label.pack(pady=5)
+        
+        return self.expenses_frame
+    
+    def build_results_frame(self):
         # Create scrollable frame
         self.results_frame = ctk.CTkScrollableFrame(self.main_frame)
-        self.results_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Title
         title_label = ctk.CTkLabel(self.results_frame, text="Resultados y Comparativas", 
@@ -441,6 +531,16 @@ class FinancialSimulatorApp(ctk.CTk):
         self.edo_details_label = ctk.CTkLabel(columns_frame, text="-")
         self.edo_details_label.grid(row=2, column=2, padx=10, pady=5, sticky="w")
         
+        # Real values: one or more annual inflation assumptions, e.g. "4, 6"
+        inflation_frame = ctk.CTkFrame(summary_frame, fg_color="transparent")
+        inflation_frame.pack(fill="x", padx=20, pady=(0, 10))
+        ctk.CTkLabel(inflation_frame, text="Inflación anual (%):").pack(side="left", padx=(0, 10))
+        self.inflation_entry = ctk.CTkEntry(inflation_frame, width=150, placeholder_text="p.ej. 4, 6")
+        self.inflation_entry.pack(side="left")
+        self.inflation_entry.bind("<Return>", lambda event: self.redraw_comparison())
+        self.real_summary_label = ctk.CTkLabel(summary_frame, text="", justify="left")
+        self.real_summary_label.pack(padx=20, pady=(0, 10), anchor="w")
+        
         # Graph comparison section
         graph_frame = ctk.CTkFrame(self.results_frame)
         graph_frame.pack(fill="both", expand=True, padx=10, pady=(20, 10))
@@ -458,6 +558,95 @@ class FinancialSimulatorApp(ctk.CTk):
                                      command=self.generate_comparison)
         compare_button.pack(pady=10)
         
+        # Progress and cancel
+        self.results_progress_bar, self.results_cancel_button = self.create_progress_row(graph_frame)
+        
+        # Monte Carlo fan chart: random expenses within Mín/Máx, g and r
+        fan_frame = ctk.CTkFrame(self.results_frame)
+        fan_frame.pack(fill="both", expand=True, padx=10, pady=(20, 10))
+        
+        fan_title = ctk.CTkLabel(fan_frame, text="Abanico Monte Carlo", 
+                               font=ctk.CTkFont(size=16, weight="bold"))
+        fan_title.pack(pady=10)
+        
+        self.fan_plot_frame = ctk.CTkFrame(fan_frame)
+        self.fan_plot_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        
+        fan_button = ctk.CTkButton(fan_frame, text="Generar Abanico", command=self.generate_fan)
+        fan_button.pack(pady=10)
+        
+        self.fan_progress_bar, self.fan_cancel_button = self.create_progress_row(fan_frame)
+        
+        return self.results_frame
+    
+    def create_goal_row(self, parent, options, command):
+        goal_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        goal_frame.pack(fill="x", padx=20, pady=(0, 10))
+        
+        ctk.CTkLabel(goal_frame, text="Meta (Bs.):").pack(side="left", padx=(0, 10))
+        target_entry = ctk.CTkEntry(goal_frame, width=120)
+        target_entry.pack(side="left", padx=(0, 10))
+        
+        ctk.CTkLabel(goal_frame, text="Despejar:").pack(side="left", padx=(0, 10))
+        option = ctk.CTkOptionMenu(goal_frame, values=options)
+        option.pack(side="left", padx=(0, 10))
+        option.set(options[0])
+        
+        ctk.CTkButton(goal_frame, text="Buscar", width=100, command=command).pack(side="left")
+        
+        result_label = ctk.CTkLabel(parent, text="")
+        result_label.pack(pady=(0, 10))
+        return target_entry, option, result_label
+    
+    def create_progress_row(self, parent):
+        progress_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        progress_frame.pack(fill="x", padx=20, pady=(0, 10))
+        
+        progress_bar = ctk.CTkProgressBar(progress_frame)
+        progress_bar.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        progress_bar.set(0)
+        
+        cancel_button = ctk.CTkButton(progress_frame, text="Cancelar", width=100, state="disabled")
+        cancel_button.pack(side="right")
+        return progress_bar, cancel_button
+    
+    def run_in_background(self, name, fn, on_done, progress_bar=None, cancel_button=None):
+        # Run fn(progress) on a worker thread and report back through after() polling
+        if name in self.tasks:
+            self.tasks[name].cancel()
+        task = BackgroundTask(fn).start()
+        self.tasks[name] = task
+        
+        def widgets_alive():
+            return (self.tasks.get(name) is task and progress_bar is not None
+                    and progress_bar.winfo_exists() and cancel_button.winfo_exists())
+        
+        if widgets_alive():
+            progress_bar.set(0)
+            cancel_button.configure(state="normal", command=task.cancel)
+        
+        def finish(progress_value):
+            if widgets_alive():
+                progress_bar.set(progress_value)
+                cancel_button.configure(state="disabled")
+            if self.tasks.get(name) is task:
+                del self.tasks[name]
+        
+        def on_progress(value):
+            if widgets_alive():
+                progress_bar.set(value)
+        
+        def done(result):
+            finish(1)
+            on_done(result)
+        
+        def error(e):
+            finish(0)
+            messagebox.showerror("Error", f"Error en la simulación: {str(e)}")
+        
+        poll(self, task, done, on_progress, error, lambda: finish(0))
+        return task
+    
     def show_context_menu(self, event):
         # Show context menu on right-click
         try:
@@ -468,7 +657,8 @@ class FinancialSimulatorApp(ctk.CTk):
     def edit_expense(self, event=None):
         # Get selected item
         selected_item = self.expenses_tree.focus()
-        if not selected_item:
+        row = self.expenses_table.row_of(selected_item) if selected_item else None
+        if row is None:
             return
         
         # Get values
@@ -509,9 +699,6 @@ class FinancialSimulatorApp(ctk.CTk):
         
         # Save button
         def save_changes():
-            # Update dataframe
-            category_idx = self.df_expenses[self.df_expenses['Categoría'] == category].index[0]
-            
             try:
                 new_min = float(min_entry.get())
                 new_max = float(max_entry.get())
@@ -521,11 +708,15 @@ class FinancialSimulatorApp(ctk.CTk):
                     messagebox.showwarning("Advertencia", "El gasto mínimo no puede ser mayor que el máximo.")
                     return
                 
-                self.df_expenses.at[category_idx, 'Gasto Mín (Bs.)'] = new_min
-                self.df_expenses.at[category_idx, 'Gasto Máx (Bs.)'] = new_max
+                # Update dataframe and running totals
+                self.ledger.set_expense(row, new_min, new_max)
+                if row == self.ledger.income_pos:
+                    self.expenses_income_entry.delete(0, "end")
+                    self.expenses_income_entry.insert(0, str(new_min))
                 
-                # Update tree
-                self.update_expenses_table()
+                # Update only the edited row
+                self.expenses_table.refresh_row(row)
+                self.update_savings_labels()
                 dialog.destroy()
                 
             except ValueError:
@@ -534,52 +725,38 @@ class FinancialSimulatorApp(ctk.CTk):
         save_button = ctk.CTkButton(dialog, text="Guardar", command=save_changes)
         save_button.grid(row=3, column=0, columnspan=2, padx=20, pady=20)
     
+    @instrument.timed('update_expenses_table')
     def update_expenses_table(self):
-        # Clear existing items
-        for item in self.expenses_tree.get_children():
-            self.expenses_tree.delete(item)
-        
-        # Insert rows from dataframe
-        for index, row in self.df_expenses.iterrows():
-            self.expenses_tree.insert("", "end", values=(
-                row['Categoría'], 
-                row['Gasto Mín (Bs.)'], 
-                row['Gasto Máx (Bs.)']
-            ))
+        # Only the visible rows are materialized
+        self.expenses_table.set_data(self.df_expenses)
     
     def load_expenses_csv(self):
+        import storage
         file_path = filedialog.askopenfilename(
             title="Seleccionar archivo CSV",
-            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+            filetypes=storage.FILETYPES
         )
         
         if file_path:
             try:
-                df = pd.read_csv(file_path)
+                # Only the read and parse are timed, not the file dialog
+                with instrument.span('load_expenses_csv'):
+                    df = storage.load_table(file_path)
                 
-                # Validate columns
-                required_columns = ['Categoría', 'Gasto Mín (Bs.)', 'Gasto Máx (Bs.)']
-                if not all(col in df.columns for col in required_columns):
-                    messagebox.showerror("Error", 
-                                       "El archivo CSV debe contener las columnas: 'Categoría', 'Gasto Mín (Bs.)', 'Gasto Máx (Bs.)'")
+                # Validate columns and ensure 'Ingreso' category exists
+                try:
+                    df = expenses.validate_ledger(df)
+                    instrument.count('expenses.rows_loaded', len(df))
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
                     return
                 
-                # Ensure 'Ingreso' category exists
-                if 'Ingreso' not in df['Categoría'].values:
-                    # Add Ingreso with 0 values
-                    income_row = pd.DataFrame({
-                        'Categoría': ['Ingreso'],
-                        'Gasto Mín (Bs.)': [0],
-                        'Gasto Máx (Bs.)': [0]
-                    })
-                    df = pd.concat([income_row, df]).reset_index(drop=True)
-                
-                self.df_expenses = df
+                self.df_expenses = expenses.Table.from_dataframe(df)
+                self.ledger.reset(self.df_expenses)
                 self.update_expenses_table()
                 
                 # Update income entry
-                income_value = self.df_expenses.loc[
-                    self.df_expenses['Categoría'] == 'Ingreso', 'Gasto Mín (Bs.)'].iloc[0]
+                income_value = self.df_expenses.get(self.ledger.income_pos, 'Gasto Mín (Bs.)')
                 self.expenses_income_entry.delete(0, "end")
                 self.expenses_income_entry.insert(0, str(income_value))
                 
@@ -588,23 +765,68 @@ class FinancialSimulatorApp(ctk.CTk):
             except Exception as e:
                 messagebox.showerror("Error", f"Error al cargar el archivo: {str(e)}")
     
+    def load_loans(self):
+        # Amortize every loan in the file; the first month's payment goes to
+        # the 'Deuda' row and the monthly payments to the VF/EDO projections
+        import loans
+        import storage
+        file_path = filedialog.askopenfilename(
+            title="Seleccionar archivo de préstamos (capital, tasa, plazo, extra)",
+            filetypes=storage.FILETYPES
+        )
+        if not file_path:
+            return
+        try:
+            # Only the read, parse and amortization are timed, not the file dialog
+            with instrument.span('load_loans'):
+                table = loans.from_table(storage.load_table(file_path))
+                args = [table[c] for c in (loans.PRINCIPAL_COL, loans.RATE_COL, loans.TERM_COL, loans.EXTRA_COL)]
+                summary = loans.summary(*args)
+                self.debt_payments = loans.monthly_payments(*args)
+                instrument.count('loans.amortized', args[0].size)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al cargar los préstamos: {str(e)}")
+            return
+        
+        had_row = self.ledger.debt_pos is not None
+        self.ledger.set_debt(float(self.debt_payments[0]))
+        if had_row:
+            self.expenses_table.refresh_row(self.ledger.debt_pos)
+        else:
+            self.update_expenses_table()
+        self.update_savings_labels()
+        self.debt_label.configure(
+            text=f"Préstamos: {args[0].size:,}, cuota actual Bs. {self.debt_payments[0]:,.2f}, "
+                 f"cancelados en {int(summary['months'].max())} meses, "
+                 f"intereses Bs. {summary['total_interest'].sum():,.2f}")
+    
+    def debt_settings(self):
+        # Extra cache-key settings when loans are loaded
+        return {} if self.debt_payments is None else {'debt': self.debt_payments.tolist()}
+    
     def save_expenses_csv(self):
+        import storage
         file_path = filedialog.asksaveasfilename(
-            title="Guardar como CSV",
+            title="Guardar planilla",
             defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
+            filetypes=storage.FILETYPES
         )
         
         if file_path:
             try:
                 # Update income value before saving
-                income_idx = self.df_expenses[self.df_expenses['Categoría'] == 'Ingreso'].index[0]
-                self.df_expenses.at[income_idx, 'Gasto Mín (Bs.)'] = float(self.expenses_income_entry.get())
-                self.df_expenses.at[income_idx, 'Gasto Máx (Bs.)'] = float(self.expenses_income_entry.get())
+                self.ledger.set_income(float(self.expenses_income_entry.get()))
                 
-                # Save to CSV
-                self.df_expenses.to_csv(file_path, index=False)
-                messagebox.showinfo("Éxito", "Archivo CSV guardado correctamente.")
+                # Save in the format of the extension; without pyarrow,
+                # .parquet/.feather end up as .npz under another name
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    saved = storage.save_table(self.df_expenses.to_dataframe(), file_path)
+                if os.path.abspath(saved) != os.path.abspath(file_path):
+                    messagebox.showwarning(
+                        "Aviso", f"pyarrow no está instalado; la planilla se guardó en formato NumPy en:\n{saved}")
+                else:
+                    messagebox.showinfo("Éxito", f"Planilla guardada en:\n{saved}")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar el archivo: {str(e)}")
@@ -613,24 +835,12 @@ class FinancialSimulatorApp(ctk.CTk):
         try:
             # Update income from entry
             income_value = float(self.expenses_income_entry.get())
-            income_idx = self.df_expenses[self.df_expenses['Categoría'] == 'Ingreso'].index[0]
-            self.df_expenses.at[income_idx, 'Gasto Mín (Bs.)'] = income_value
-            self.df_expenses.at[income_idx, 'Gasto Máx (Bs.)'] = income_value
-            
-            # Calculate total expenses (excluding income)
-            expenses_df = self.df_expenses[self.df_expenses['Categoría'] != 'Ingreso']
-            total_min_expense = expenses_df['Gasto Mín (Bs.)'].sum()
-            total_max_expense = expenses_df['Gasto Máx (Bs.)'].sum()
+            self.ledger.set_income(income_value)
+            self.expenses_table.refresh_row(self.ledger.income_pos)
             
-            # Calculate savings
-            min_savings = income_value - total_max_expense  # Scenario with maximum expenses
-            max_savings = income_value - total_min_expense  # Scenario with minimum expenses
-            
-            # Update labels
-            self.min_expenses_label.configure(text=f"Total gastos mínimos: Bs. {total_min_expense:,.2f}")
-            self.max_expenses_label.configure(text=f"Total gastos máximos: Bs. {total_max_expense:,.2f}")
-            self.min_savings_label.configure(text=f"Ahorro en escenario de gasto MÁXIMO: Bs. {min_savings:,.2f}")
-            self.max_savings_label.configure(text=f"Ahorro en escenario de gasto MÍNIMO: Bs. {max_savings:,.2f}")
+            # Totals and savings are kept up to date by the ledger
+            min_savings, max_savings = self.update_savings_labels()
+            self.update_scenarios_label()
             
             # Update monthly contribution in VF calculation
             self.vf_params['P'] = min_savings  # Use minimum savings as default monthly contribution
@@ -646,6 +856,68 @@ class FinancialSimulatorApp(ctk.CTk):
             messagebox.showerror("Error", f"Error al calcular ahorros: {str(e)}")
             return 0, 0
     
+    def update_savings_labels(self):
+        summary = self.ledger.summary()
+        min_savings = summary['min_savings']  # Scenario with maximum expenses
+        max_savings = summary['max_savings']  # Scenario with minimum expenses
+        
+        # Update labels
+        self.min_expenses_label.configure(text=f"Total gastos mínimos: Bs. {summary['total_min_expense']:,.2f}")
+        self.max_expenses_label.configure(text=f"Total gastos máximos: Bs. {summary['total_max_expense']:,.2f}")
+        self.min_savings_label.configure(text=f"Ahorro en escenario de gasto MÁXIMO: Bs. {min_savings:,.2f}")
+        self.max_savings_label.configure(text=f"Ahorro en escenario de gasto MÍNIMO: Bs. {max_savings:,.2f}")
+        return min_savings, max_savings
+    
+    def update_scenarios_label(self):
+        # Distribution of the savings over every Mín/Máx combination
+        # (sampled when there are too many categories to enumerate). It
+        # takes tens of milliseconds, so it runs on a worker thread, and
+        # results are kept by expense ranges and income
+        key = self.scenario_key()
+        mins, maxs, income = key
+        if key in self.scenario_results:
+            self.scenario_results.move_to_end(key)
+            self.show_scenarios(self.scenario_results[key])
+            return
+        
+        def compute(progress):
+            import scenarios
+            return scenarios.run(mins, maxs, income, seed=0, progress=progress)
+        
+        def done(result):
+            self.scenario_results[key] = result
+            while len(self.scenario_results) > self.SCENARIO_RESULTS:
+                self.scenario_results.popitem(last=False)
+            if key == self.scenario_key():  # the ledger may have changed meanwhile
+                self.show_scenarios(result)
+        
+        self.scenarios_label.configure(text="Escenarios: calculando...")
+        self.run_in_background('scenarios', compute, done)
+    
+    def scenario_key(self):
+        mins, maxs = self.ledger.ranges()
+        return tuple(mins), tuple(maxs), float(self.ledger.income)
+    
+    def show_scenarios(self, result):
+        if not self.scenarios_label.winfo_exists():
+            return
+        q = result['quantiles']
+        self.scenarios_label.configure(
+            text=f"Escenarios ({result['n_scenarios']:,}): mediana Bs. {q[50]:,.2f}, "
+                 f"P5 Bs. {q[5]:,.2f}, P95 Bs. {q[95]:,.2f}, "
+                 f"ahorro negativo en {result['p_deficit']:.1%}")
+    
+    def on_income_typed(self, event=None):
+        # Live update of the savings while the income is being typed
+        try:
+            income_value = float(self.expenses_income_entry.get())
+        except ValueError:
+            return
+        self.ledger.set_income(income_value)
+        self.expenses_table.refresh_row(self.ledger.income_pos)
+        self.update_savings_labels()
+    
+    @instrument.timed('calculate_vf')
     def calculate_vf(self):
         try:
             # Get parameters from entries
@@ -658,17 +930,17 @@ class FinancialSimulatorApp(ctk.CTk):
             self.vf_params['r_annual'] = r_annual
             self.vf_params['n_months'] = n_months
             
-            # Calculate monthly rate
-            r_monthly = r_annual / 12
-            
-            # Calculate future value
-            if r_monthly != 0:
-                FV = P * ((1 + r_monthly)**n_months - 1) / r_monthly
-            else:
-                FV = P * n_months
+            # Calculate future value and the curve to plot (cached)
+            from cache import make_key
+            key = make_key('vf', self.vf_params, **self.debt_settings())
+            cached = self.results_cache.get(key)
+            if cached is None:
+                cached = self.results_cache.put(key, self.compute_vf(
+                    self.vf_params, self.debt_payments, self.horizon_cache))
+            FV = float(cached[0])
             
-            # Total contributions
-            total_contributions = P * n_months
+            # Total contributions (larger once the loans are paid off)
+            total_contributions = float(cached[3]) if len(cached) > 3 else P * n_months
             
             # Interest earned
             interest_earned = FV - total_contributions
@@ -686,16 +958,7 @@ class FinancialSimulatorApp(ctk.CTk):
                     text=f"Aporte: Bs. {P:,.2f}/mes, Tasa: {r_annual*100:.2f}%, Plazo: {n_months} meses"
                 )
 
-            # Genero un vector de tiempos y valores de VF para graficar luego
-            n_years = n_months / 12
-            self.vf_times = np.linspace(0, n_years, 100)
-            if r_annual != 0:
-                self.vf_values = [P*12 * ((1+r_annual)**t - 1)/r_annual for t in self.vf_times]
-            else:
-                self.vf_values = [P*12*t for t in self.vf_times]
-            self.P = float(self.monthly_contrib_entry.get())         # Aporte mensual
-            self.r_annual = float(self.annual_rate_entry.get())/100  # Tasa anual en decimal
-            self.n_months = int(self.months_entry.get())    
+            self.apply_vf_result(cached)
             
             return FV
             
@@ -703,12 +966,74 @@ class FinancialSimulatorApp(ctk.CTk):
             messagebox.showerror("Error", "Ingrese valores numéricos válidos.")
             return 0
     
+    @instrument.timed('seek_vf_goal')
+    def seek_vf_goal(self):
+        import goalseek
+        unknown = self.VF_GOALS[self.vf_goal_option.get()]
+        try:
+            target = float(self.vf_goal_entry.get())
+            known = {
+                'P': float(self.monthly_contrib_entry.get()),
+                'r_annual': float(self.annual_rate_entry.get()) / 100,
+                'n_months': int(self.months_entry.get()),
+            }
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese valores numéricos válidos.")
+            return
+        known.pop(unknown)
+        value = float(goalseek.solve_vf(target, unknown, **known))
+        if not math.isfinite(value):
+            self.vf_goal_label.configure(text="La meta no se alcanza con los demás parámetros.")
+            return
+        
+        # Write the solution into its entry and recompute the results
+        if unknown == 'P':
+            entry, text, shown = self.monthly_contrib_entry, f"{value:.2f}", f"Aporte mensual: Bs. {value:,.2f}"
+        elif unknown == 'r_annual':
+            entry, text, shown = self.annual_rate_entry, f"{value * 100:.4f}", f"Tasa anual: {value * 100:.4f}%"
+        else:
+            entry, text, shown = self.months_entry, str(int(value)), f"Plazo: {int(value)} meses"
+        entry.delete(0, "end")
+        entry.insert(0, text)
+        if unknown == 'n_months':
+            self.years_label.configure(text=f"{int(value)/12:.1f}")
+        self.vf_goal_label.configure(text=f"Meta de Bs. {target:,.2f} con {shown}")
+        self.calculate_vf()
+    
+    @staticmethod
+    @instrument.timed('compute_vf')
+    def compute_vf(params, debt=None, horizons=None):
+        # Future value and the curve to plot
+        import numpy as np
+        from annuity import future_value, yearly_curve
+        P, r_annual, n_months = params['P'], params['r_annual'], params['n_months']
+        if debt is None and horizons is not None:
+            # Monthly curve, only the new months are computed when the term grows
+            return horizons.vf(params)
+        vf_times = np.linspace(0, n_months / 12, 100)
+        if debt is None:
+            return future_value(P, r_annual, n_months), vf_times, yearly_curve(P, r_annual, vf_times)
+        
+        # What is no longer paid on the loans is added to the contribution;
+        # the curve is the monthly balance and the total contributed comes last
+        from schedules import vf_trajectory
+        months, values = vf_trajectory(P, [r_annual], n_months, debt=debt)
+        _, paid = vf_trajectory(P, [0.0], n_months, debt=debt)
+        return values[0, -1], vf_times, np.interp(vf_times * 12, months, values[0]), paid[0, -1]
+    
+    def apply_vf_result(self, result):
+        # Genero un vector de tiempos y valores de VF para graficar luego
+        self.vf_times, self.vf_values = result[1], result[2]
+        self.P = self.vf_params['P']                # Aporte mensual
+        self.r_annual = self.vf_params['r_annual']  # Tasa anual en decimal
+        self.n_months = self.vf_params['n_months']
+    
     def dAdt(self, t, A, I0, g, c0, c1, c2, r):
         # EDO function: dA/dt = I - C + rA
-        I = I0 * np.exp(g * t)  # Income grows exponentially
-        C = c0 + c1 * I - c2 * A  # Consumption function
-        return I - C + r * A
+        import edo
+        return edo.dAdt(t, A, I0, g, c0, c1, c2, r)
     
+    @instrument.timed('simulate_edo')
     def simulate_edo(self):
         try:
             # Get parameters from entries
@@ -731,120 +1056,212 @@ class FinancialSimulatorApp(ctk.CTk):
             self.edo_params['A0'] = A0
             self.edo_params['T'] = T
             
-            # Simulation parameters
-            t0 = 0
-            dt = 0.1
-            n_steps = int((T - t0) / dt)
-            
-            # Arrays for storing results
-            times = np.linspace(t0, T, n_steps+1)
-            A_values = np.zeros(n_steps+1)
-            I_values = np.zeros(n_steps+1)
-            C_values = np.zeros(n_steps+1)
-            
-            # Initial conditions
-            A_values[0] = A0
-            I_values[0] = I0
-            C_values[0] = c0 + c1 * I0 - c2 * A0
-            
-            # RK4 Integration
-            A = A0
-            t = t0
-            
-            for i in range(1, n_steps+1):
-                k1 = self.dAdt(t, A, I0, g, c0, c1, c2, r)
-                k2 = self.dAdt(t + dt/2, A + k1 * dt/2, I0, g, c0, c1, c2, r)
-                k3 = self.dAdt(t + dt/2, A + k2 * dt/2, I0, g, c0, c1, c2, r)
-                k4 = self.dAdt(t + dt, A + k3 * dt, I0, g, c0, c1, c2, r)
-                A = A + (dt / 6) * (k1 + 2*k2 + 2*k3 + k4)
-                t += dt
-                
-                A_values[i] = A
-                I_values[i] = I0 * np.exp(g * t)
-                C_values[i] = c0 + c1 * I_values[i] - c2 * A_values[i]
-            
-            # Final result
-            final_A = A_values[-1]
-            
-            # Update result label
-            self.edo_result_label.configure(text=f"Valor acumulado final: Bs. {final_A:,.2f}")
-            
-            # Update summary in results frame
-            if hasattr(self, 'edo_summary_label') and self.edo_summary_label.winfo_exists():
-                self.edo_summary_label.configure(text=f"Bs. {final_A:,.2f}")
-                self.edo_details_label.configure(
-                    text=f"I0: Bs. {I0:,.2f}, g: {g:.2f}, r: {r:.2f}, T: {T} años"
-                )
-            
-            # Clear existing graph
-            for widget in self.graph_frame.winfo_children():
-                widget.destroy()
-            
-            # Create plot
-            fig, ax = plt.subplots(figsize=(8, 5))
-            ax.plot(times, A_values, 'b-', label='Ahorro (A)')
-            ax.plot(times, I_values, 'g--', label='Ingreso (I)')
-            ax.plot(times, C_values, 'r-.', label='Consumo (C)')
-            
-            ax.set_xlabel('Tiempo (años)')
-            ax.set_ylabel('Valor (Bs.)')
-            ax.set_title('Simulación de Modelo Continuo (EDO)')
-            ax.legend()
-            ax.grid(True)
-            
-            # Embed plot
-            canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-
-            self.edo_times  = times
-            self.edo_values = A_values
-            self.edo_final  = final_A
-
-            self.K0 = float(self.i0_entry.get())
-            self.r = float(self.r_entry.get()) / 100
-            self.dt = float(dt)
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese valores numéricos válidos para todos los parámetros.")
+            return
+        
+        # Solve the EDO (closed form by default, RK4 as cross-check)
+        from cache import make_key
+        settings = self.edo_settings()
+        key = make_key('edo', self.edo_params, **settings, **self.debt_settings())
+        cached = self.results_cache.get(key)
+        if cached is not None:
+            self.show_edo_result(cached)
+            return
+        
+        params, debt, horizons = dict(self.edo_params), self.debt_payments, self.horizon_cache
+        self.run_in_background(
+            'edo',
+            lambda progress: self.compute_edo(params, settings, progress, debt, horizons),
+            lambda result: self.show_edo_result(self.results_cache.put(key, result)),
+            self.edo_progress_bar, self.edo_cancel_button)
     
-            return final_A, times, A_values, I_values, C_values
-            
+    @instrument.timed('seek_edo_goal')
+    def seek_edo_goal(self):
+        import goalseek
+        unknown = self.EDO_GOALS[self.edo_goal_option.get()]
+        entries = self.edo_entries()
+        try:
+            target = float(self.edo_goal_entry.get())
+            known = {name: float(entry.get()) for name, entry in entries.items()
+                     if name != unknown}
         except ValueError:
             messagebox.showerror("Error", "Ingrese valores numéricos válidos para todos los parámetros.")
-            return 0, [], [], [], []
+            return
+        T = known.pop('T')
+        value = float(goalseek.solve_edo(target, unknown, known, T)[0])
+        if not math.isfinite(value):
+            self.edo_goal_label.configure(text="La meta no se alcanza con los demás parámetros.")
+            return
         
+        # Write the solution into its entry and run the simulation
+        entries[unknown].delete(0, "end")
+        entries[unknown].insert(0, f"{value:.6g}")
+        self.edo_goal_label.configure(text=f"Meta de Bs. {target:,.2f} con {unknown} = {value:.6g}")
+        self.simulate_edo()
+    
+    def edo_entries(self):
+        return {'I0': self.i0_entry, 'g': self.g_entry, 'c0': self.c0_entry, 'c1': self.c1_entry,
+                'c2': self.c2_entry, 'r': self.r_entry, 'A0': self.a0_entry, 'T': self.t_entry}
+    
+    def edo_settings(self):
+        # Simulation parameters
+        return {'t0': 0, 'dt': 0.1, 'method': self.edo_method,
+                'rtol': self.edo_rtol, 'atol': self.edo_atol}
+    
+    @staticmethod
+    @instrument.timed('compute_edo')
+    def compute_edo(params, settings, progress=None, debt=None, horizons=None):
+        import edo
+        p = params
+        args = (p['I0'], p['g'], p['c0'], p['c1'], p['c2'], p['r'], p['A0'], p['T'])
+        if debt is None and settings.get('method') == 'rk45':
+            # The step statistics describe one whole run, so RK45 is not
+            # extended incrementally; they travel as a fifth array
+            import numpy as np
+            times, A_values, I_values, C_values, info = edo.solve(
+                *args, progress=progress, return_info=True, **settings)
+            stats = np.array([info['nfev'], info['n_steps'], info['n_rejected'],
+                              info['max_error'], info['error_estimate'][0]])
+            return times, A_values[0], I_values[0], C_values[0], stats
+        elif debt is None and horizons is not None:
+            # Continues from the stored endpoint when only T grew
+            times, A_values, I_values, C_values = horizons.edo(params, settings, progress)
+        elif debt is None:
+            times, A_values, I_values, C_values = edo.solve(*args, progress=progress, **settings)
+        else:
+            # Loan payments leave the savings each month until paid off
+            import schedules
+            times, A_values, I_values, C_values = schedules.solve(
+                *args, {schedules.DEBT_COL: debt}, t0=settings['t0'], dt=settings['dt'])
+        return times, A_values[0], I_values[0], C_values[0]
+    
+    def apply_edo_result(self, result):
+        times, A_values, I_values, C_values = result[:4]
+        self.edo_times  = times
+        self.edo_values = A_values
+        self.edo_final  = A_values[-1]
+        
+        self.K0 = self.edo_params['I0']
+        self.r = self.edo_params['r'] / 100
+        self.dt = float(self.edo_settings()['dt'])
+        
+        # Update summary in results frame
+        if hasattr(self, 'edo_summary_label') and self.edo_summary_label.winfo_exists():
+            p = self.edo_params
+            self.edo_summary_label.configure(text=f"Bs. {self.edo_final:,.2f}")
+            self.edo_details_label.configure(
+                text=f"I0: Bs. {p['I0']:,.2f}, g: {p['g']:.2f}, r: {p['r']:.2f}, T: {p['T']} años"
+            )
+    
+    @instrument.timed('show_edo_result')
+    def show_edo_result(self, result):
+        self.apply_edo_result(result)
+        times, A_values, I_values, C_values = result[:4]
+        if not self.edo_result_label.winfo_exists():
+            return
+        
+        # Update result label (with the step statistics of an RK45 run)
+        text = f"Valor acumulado final: Bs. {self.edo_final:,.2f}"
+        if len(result) > 4:
+            nfev, n_steps, n_rejected, max_error, error_estimate = result[4]
+            text += (f"\nRK45: {int(n_steps)} pasos ({int(n_rejected)} rechazados), "
+                     f"{int(nfev)} evaluaciones, error estimado ±Bs. {error_estimate:,.4f}")
+        self.edo_result_label.configure(text=text)
+        
+        # Create the plot once per frame, then only update its data
+        if self.edo_plot is None or not self.edo_plot.alive():
+            from plots import PlotPanel
+            self.edo_plot = PlotPanel(
+                self.graph_frame, 'Simulación de Modelo Continuo (EDO)', 'Tiempo (años)', 'Valor (Bs.)',
+                [('A', 'b-', 'Ahorro (A)'), ('I', 'g--', 'Ingreso (I)'), ('C', 'r-.', 'Consumo (C)')])
+        self.edo_plot.update({'A': (times, A_values), 'I': (times, I_values), 'C': (times, C_values)})
+        
+    @instrument.timed('generate_comparison')
     def generate_comparison(self):
         # Asegurarse de tener datos
-        if not hasattr(self, 'vf_times') or not hasattr(self, 'edo_times'):
-            # Si aún no se calcularon, forzamos uno
-            self.calculate_vf()
-            self.simulate_edo()
+        if hasattr(self, 'vf_times') and hasattr(self, 'edo_times'):
+            self.draw_comparison()
+            return
 
-        # Limpiar plot anterior
-        for w in self.plot_frame.winfo_children():
-            w.destroy()
+        # Si aún no se calcularon, los calculamos en segundo plano con los
+        # parámetros actuales
+        from cache import make_key
+        vf_key = make_key('vf', self.vf_params, **self.debt_settings())
+        settings = self.edo_settings()
+        edo_key = make_key('edo', self.edo_params, **settings, **self.debt_settings())
+        vf_cached = self.results_cache.get(vf_key)
+        edo_cached = self.results_cache.get(edo_key)
+        vf_params, edo_params = dict(self.vf_params), dict(self.edo_params)
+        debt, horizons = self.debt_payments, self.horizon_cache
 
-        # Crear figura
-        fig, ax = plt.subplots(figsize=(8, 5))
+        def compute(progress):
+            vf_result = vf_cached if vf_cached is not None else self.compute_vf(vf_params, debt, horizons)
+            edo_result = edo_cached if edo_cached is not None else self.compute_edo(
+                edo_params, settings, progress, debt, horizons)
+            return vf_result, edo_result
 
-        # Graficar EDO
-        ax.plot(self.edo_times, self.edo_values, label='Modelo Continuo (EDO)')
+        def done(result):
+            vf_result, edo_result = result
+            self.apply_vf_result(self.results_cache.put(vf_key, vf_result))
+            self.apply_edo_result(self.results_cache.put(edo_key, edo_result))
+            self.draw_comparison()
 
-        # Graficar VF discreto
-        ax.plot(self.vf_times, self.vf_values, '--', label='Anualidad Discreta (VF)')
+        self.run_in_background('comparison', compute, done,
+                               self.results_progress_bar, self.results_cancel_button)
 
-        ax.set_xlabel('Tiempo (años)')
-        ax.set_ylabel('Valor acumulado (Bs.)')
-        ax.set_title('Comparativa de Modelos de Ahorro')
-        ax.legend()
-        ax.grid(True)
+    def inflation_rates(self):
+        # Annual inflation rates (decimal) typed in the results frame
+        try:
+            return [float(value) / 100 for value in self.inflation_entry.get().replace(';', ',').split(',')
+                    if value.strip()]
+        except ValueError:
+            messagebox.showwarning("Advertencia", "Ingrese inflaciones numéricas separadas por comas.")
+            return []
+    
+    def redraw_comparison(self):
+        # New inflation assumptions only need the curves already computed
+        if hasattr(self, 'vf_times') and hasattr(self, 'edo_times'):
+            self.draw_comparison()
+    
+    @instrument.timed('draw_comparison')
+    def draw_comparison(self):
+        if not self.plot_frame.winfo_exists():
+            return
+
+        # Crear la figura una sola vez y luego solo actualizar los datos
+        if self.comparison_plot is None or not self.comparison_plot.alive():
+            from plots import PlotPanel
+            self.comparison_plot = PlotPanel(
+                self.plot_frame, 'Comparativa de Modelos de Ahorro', 'Tiempo (años)', 'Valor acumulado (Bs.)',
+                [('edo', '-', 'Modelo Continuo (EDO)'), ('vf', '--', 'Anualidad Discreta (VF)')])
 
         # Anotaciones de valor final
-        ax.text(0.02, 0.95, f'VF final: Bs. {self.vf_values[-1]:,.2f}', transform=ax.transAxes)
-        ax.text(0.02, 0.90, f'EDO final: Bs. {self.edo_final:,.2f}', transform=ax.transAxes)
+        self.comparison_plot.set_text('vf', 0.02, 0.95, f'VF final: Bs. {self.vf_values[-1]:,.2f}')
+        self.comparison_plot.set_text('edo', 0.02, 0.90, f'EDO final: Bs. {self.edo_final:,.2f}')
 
-        # Insertar en el frame
-        canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        # Curvas reales: un producto por curva con las tablas de descuento
+        # en caché, sin volver a integrar
+        import inflation
+        rates = self.inflation_rates()
+        real_vf = inflation.deflate(self.vf_values, self.vf_times, rates)
+        real_edo = inflation.deflate(self.edo_values, self.edo_times, rates)
+        lines, curves, finals = [], {}, []
+        for rate in rates:
+            key = inflation.label(rate)
+            lines += [(f'edo_{key}', ':', f'EDO real ({rate * 100:g}%)'),
+                      (f'vf_{key}', '-.', f'VF real ({rate * 100:g}%)')]
+            curves[f'edo_{key}'] = (self.edo_times, real_edo[key])
+            curves[f'vf_{key}'] = (self.vf_times, real_vf[key])
+            finals.append(f"Inflación {rate * 100:g}%: VF real Bs. {real_vf[key][-1]:,.2f}, "
+                          f"EDO real Bs. {real_edo[key][-1]:,.2f}")
+        self.comparison_plot.set_lines(lines)
+        self.real_summary_label.configure(text="\n".join(finals))
+        
+        # Graficar EDO y VF discreto
+        curves.update({'edo': (self.edo_times, self.edo_values),
+                       'vf': (self.vf_times, self.vf_values)})
+        self.comparison_plot.update(curves)
 
         # ——— ACTUALIZAR RESÚMENES ———
         # Valor Futuro (discreto)
@@ -862,6 +1279,69 @@ class FinancialSimulatorApp(ctk.CTk):
         )
 
 
+    @instrument.timed('generate_fan')
+    def generate_fan(self):
+        # Percentile bands of both models over random paths, computed in
+        # chunks on a worker thread with the current expenses and parameters
+        import montecarlo
+        mins, maxs = self.ledger.ranges()
+        income = self.ledger.income
+        edo_params, n_months = dict(self.edo_params), int(self.vf_params['n_months'])
+        self.run_in_background(
+            'montecarlo',
+            lambda progress: montecarlo.run(self.FAN_PATHS, mins, maxs, income, edo_params,
+                                            n_months=n_months, seed=0, progress=progress),
+            self.draw_fan, self.fan_progress_bar, self.fan_cancel_button)
+    
+    def draw_fan(self, result):
+        if not self.fan_plot_frame.winfo_exists():
+            return
+        if self.fan_plot is None or not self.fan_plot.alive():
+            from plots import PlotPanel
+            self.fan_plot = PlotPanel(
+                self.fan_plot_frame, 'Abanico Monte Carlo del ahorro', 'Tiempo (años)', 'Ahorro acumulado (Bs.)',
+                [('edo', '-', 'EDO (P50)'), ('annuity', '--', 'Anualidad (P50)')])
+        curves = {}
+        for name, label in (('edo', 'EDO'), ('annuity', 'Anualidad')):
+            fan = result[name]
+            q = fan['percentiles']
+            self.fan_plot.set_band(name, fan['times'], q[5], q[95], f'{label} (P5-P95)')
+            curves[name] = (fan['times'], q[50])
+        self.fan_plot.update(curves)
+
+
+def report_timings(app, started):
+    # Print startup timings once the window is first mapped
+    reported = []
+    
+    def on_map(event):
+        if event.widget is not app or reported:
+            return
+        reported.append(True)
+        now = time.perf_counter()
+        print(f"Importaciones:          {(started - _START) * 1000:8.1f} ms")
+        print(f"Construcción ventana:   {(app.built_at - started) * 1000:8.1f} ms")
+        print(f"Hasta primera ventana:  {(now - _START) * 1000:8.1f} ms")
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"Módulos pesados cargados: {', '.join(loaded) or 'ninguno'}")
+    app.bind("<Map>", on_map, add="+")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador Financiero")
+    parser.add_argument("--timings", action="store_true",
+                        help="Muestra el tiempo hasta la primera ventana")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Registra tiempos y contadores y los muestra al salir")
+    parser.add_argument("--profile", metavar="ARCHIVO",
+                        help="Guarda un perfil cProfile (.prof) al salir")
+    args = parser.parse_args()
+    if args.instrument or args.profile:
+        instrument.enable(args.profile)
+    
+    started = time.perf_counter()
     app = FinancialSimulatorApp()
+    app.built_at = time.perf_counter()
+    if args.timings:
+        report_timings(app, started)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import numpy as np
+
+from annuity import growth_factor
+
+# Amortización de préstamos con cuota fija (sistema francés).
+# Un préstamo tiene capital, tasa anual (decimal), plazo en meses y un
+# pago extra mensual opcional que se aplica al capital. Todo está en forma
+# cerrada y vectorizado sobre los préstamos: con F(m) = ((1 + r)^m - 1) / r
+# la cuota es P (1 + r F(n)) / F(n) y el saldo tras m meses es
+# P (1 + r F(m)) - q F(m), con q = cuota + extra. El mes de cancelación se
+# despeja del saldo, así que los totales de una cartera se obtienen sin
+# recorrer los meses: cada préstamo paga q hasta su último mes, que es
+# menor, y la suma mensual se arma con np.bincount.
+
+PRINCIPAL_COL = 'capital'
+RATE_COL = 'tasa'
+TERM_COL = 'plazo'
+EXTRA_COL = 'extra'
+LOAN_COLUMNS = (PRINCIPAL_COL, RATE_COL, TERM_COL)
+
+
+def from_table(df):
+    """Préstamos de un DataFrame: {columna: array}, 'extra' en 0 si falta."""
+    missing = [c for c in LOAN_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"El archivo de préstamos debe tener las columnas: {', '.join(LOAN_COLUMNS)}")
+    loans = {c: df[c].to_numpy(dtype=float) for c in LOAN_COLUMNS}
+    loans[EXTRA_COL] = (df[EXTRA_COL].to_numpy(dtype=float) if EXTRA_COL in df.columns
+                        else np.zeros(len(df)))
+    bad = np.flatnonzero(~(loans[TERM_COL] > 0))
+    if bad.size:
+        # A term of 0 months (or less) gives an infinite payment
+        rows = ', '.join(str(i + 1) for i in bad[:10])
+        raise ValueError(f"El plazo ('{TERM_COL}') debe ser mayor que 0 meses; filas: {rows}")
+    return loans
+
+
+def read_loans(path):
+    import pandas as pd
+    return from_table(pd.read_csv(path))
+
+
+def payment(principal, r_annual, n_months):
+    """Cuota mensual fija que cancela el préstamo en n_months."""
+    principal = np.asarray(principal, dtype=float)
+    r_monthly = np.asarray(r_annual, dtype=float) / 12
+    F = growth_factor(r_monthly, np.asarray(n_months, dtype=float))
+    return principal * (1 + r_monthly * F) / F
+
+
+def balance(principal, r_annual, n_months, months, extra=0.0):
+    """Saldo tras `months` meses pagando cuota + extra (0 una vez cancelado)."""
+    principal = np.asarray(principal, dtype=float)
+    r_monthly = np.asarray(r_annual, dtype=float) / 12
+    q = payment(principal, r_annual, n_months) + extra
+    F = growth_factor(r_monthly, np.asarray(months, dtype=float))
+    return np.maximum(principal * (1 + r_monthly * F) - q * F, 0.0)
+
+
+def payoff_months(principal, r_annual, n_months, extra=0.0):
+    """Mes en que se hace el último pago (n_months sin pagos extra)."""
+    principal = np.asarray(principal, dtype=float)
+    r_monthly = np.asarray(r_annual, dtype=float) / 12
+    n_months = np.asarray(n_months, dtype=float)
+    q = payment(principal, r_annual, n_months) + extra
+    # B(m) = 0  <=>  F(m) = P / (q - P r)
+    F = principal / (q - principal * r_monthly)
+    zero = r_monthly == 0
+    safe_r = np.where(zero, 1.0, r_monthly)
+    months = np.where(zero, F, np.log1p(safe_r * F) / np.log1p(safe_r))
+    return np.clip(np.ceil(months - 1e-9), 1, n_months).astype(np.int64)
+
+
+def summary(principal, r_annual, n_months, extra=0.0):
+    """Por préstamo: cuota, último mes, último pago, total pagado e intereses."""
+    principal, r_annual, n_months, extra = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (principal, r_annual, n_months, extra)))
+    q = payment(principal, r_annual, n_months) + extra
+    months = payoff_months(principal, r_annual, n_months, extra)
+    last = balance(principal, r_annual, n_months, months - 1, extra) * (1 + r_annual / 12)
+    total = q * (months - 1) + last
+    return {'payment': q, 'months': months, 'last_payment': last,
+            'total_paid': total, 'total_interest': total - principal}
+
+
+def schedule(principal, r_annual, n_months, extra=0.0):
+    """Tabla de amortización completa, de forma (préstamos, meses).
+
+    Devuelve un dict con 'month' (1..max plazo) y arrays 'payment',
+    'interest', 'amortization' y 'balance' (saldo al final de cada mes),
+    en 0 después de la cancelación.
+    """
+    principal, r_annual, n_months, extra = (a[:, None] for a in np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (principal, r_annual, n_months, extra))))
+    months = np.arange(1, int(n_months.max()) + 1)
+    start = balance(principal, r_annual, n_months, months - 1, extra)
+    interest = start * r_annual / 12
+    q = payment(principal, r_annual, n_months) + extra
+    paid = np.minimum(q, start + interest)
+    return {'month': months, 'payment': paid, 'interest': interest,
+            'amortization': paid - interest, 'balance': start + interest - paid}
+
+
+def monthly_payments(principal, r_annual, n_months, extra=0.0, horizon=None):
+    """Pago total de la cartera en cada mes 1..horizon (elemento 0 = mes 1).
+
+    Sin horizon llega hasta un mes después de la última cancelación, así
+    que el último valor es 0.
+    """
+    s = summary(principal, r_annual, n_months, extra)
+    months = np.atleast_1d(s['months'])
+    if horizon is None:
+        horizon = int(months.max()) + 1 if months.size else 1
+    q, last = np.atleast_1d(s['payment']), np.atleast_1d(s['last_payment'])
+    # q from month 1 up to (not including) the payoff month, then the last payment
+    steps = np.bincount(np.minimum(months - 1, horizon), weights=q, minlength=horizon + 1)
+    totals = q.sum() - np.cumsum(steps)[:horizon]
+    inside = months <= horizon
+    totals += np.bincount(months[inside] - 1, weights=last[inside], minlength=horizon)[:horizon]
+    return totals
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 100000
+    principal = rng.uniform(1000, 100000, n)
+    r_annual = rng.uniform(0.0, 0.2, n)
+    n_months = rng.integers(6, 361, n)
+    extra = np.where(rng.random(n) < 0.3, rng.uniform(0, 500, n), 0.0)
+
+    start = time.perf_counter()
+    s = summary(principal, r_annual, n_months, extra)
+    totals = monthly_payments(principal, r_annual, n_months, extra)
+    elapsed = time.perf_counter() - start
+    print(f"{n:,} préstamos: {elapsed * 1000:.1f} ms, pago del primer mes Bs. {totals[0]:,.2f}, "
+          f"intereses totales Bs. {s['total_interest'].sum():,.2f}")
+
+    # Check against the month-by-month table on a sample
+    sample = slice(0, 2000)
+    table = schedule(principal[sample], r_annual[sample], n_months[sample], extra[sample])
+    print("Total pagado coincide con la tabla:",
+          np.allclose(table['payment'].sum(axis=1), s['total_paid'][sample]),
+          "saldo final:", float(np.abs(table['balance'][:, -1]).max()))
@@ -0,0 +1,220 @@
+import numpy as np
+
+from edo import simulate_analytic
+from expenses import CATEGORY_COL, INCOME, MAX_COL, MIN_COL, SAMPLE_CSV
+
+# Simulación Monte Carlo del ahorro.
+# - Anualidad: cada mes se sortea el gasto de cada categoría dentro de su
+#   rango [Mín, Máx]; el ingreso crece con una tasa g propia de cada
+#   trayectoria y el saldo rinde un retorno mensual aleatorio.
+# - EDO: cada trayectoria usa g y r aleatorios en la solución analítica.
+# Las trayectorias se generan por bloques (chunk_size) y solo se conserva
+# un histograma por instante de tiempo, de modo que la memoria no depende
+# del número total de trayectorias. El rango del histograma lo fija el
+# primer bloque; si un bloque posterior cae fuera, se duplica el ancho de
+# los bins (sumando pares) hasta que entre, sin recortar valores. Los
+# valores no finitos (desbordes de la EDO con T grande o r extremos) no
+# entran al histograma: se cuentan aparte por instante ('nonfinite') y
+# los percentiles y la media son los de las trayectorias finitas.
+
+
+def expense_ranges(df):
+    """(mins, maxs, income) a partir de la planilla de gastos."""
+    is_income = df[CATEGORY_COL].str.lower() == INCOME.lower()
+    expenses = df[~is_income]
+    income = float(df.loc[is_income, MIN_COL].iloc[0]) if is_income.any() else 0.0
+    return (expenses[MIN_COL].to_numpy(dtype=float),
+            expenses[MAX_COL].to_numpy(dtype=float),
+            income)
+
+
+def annuity_paths(rng, n_paths, income, mins, maxs, n_months,
+                  g_mean=0.0, g_std=0.0, r_mean=0.0, r_std=0.0):
+    """Saldos mensuales (n_paths, n_months + 1) con gastos, crecimiento del
+    ingreso y retornos aleatorios. Aportes al final de cada mes."""
+    mins = np.asarray(mins, dtype=float)
+    spread = np.asarray(maxs, dtype=float) - mins
+    base = mins.sum()
+
+    g = rng.normal(g_mean, g_std, n_paths)
+    balances = np.empty((n_paths, n_months + 1))
+    balances[:, 0] = 0.0
+    B = balances[:, 0].copy()
+    for month in range(1, n_months + 1):
+        income_t = income * np.exp(g * month / 12)
+        expenses = base + rng.random((n_paths, mins.size)) @ spread
+        r_t = rng.normal(r_mean / 12, r_std / np.sqrt(12), n_paths)
+        B = B * (1 + r_t) + (income_t - expenses)
+        balances[:, month] = B
+    return balances
+
+
+def edo_paths(rng, n_paths, edo_params, times, g_std=0.0, r_std=0.0):
+    """A(t) (n_paths, len(times)) con g y r sorteados por trayectoria."""
+    p = edo_params
+    g = rng.normal(p['g'], g_std, n_paths)
+    r = rng.normal(p['r'], r_std, n_paths)
+    A_values, _, _ = simulate_analytic(p['I0'], g, p['c0'], p['c1'], p['c2'], r,
+                                       p['A0'], times)
+    return A_values
+
+
+class _FanAccumulator:
+    # Per-time-step histograms whose bin range is set by the first chunk
+    # and widened when a later chunk falls outside it. Non-finite values
+    # are only counted, per time step.
+
+    def __init__(self, n_bins=4096):
+        self.n_bins = n_bins + n_bins % 2  # even, so bins merge in pairs
+        self.counts = None
+        self.total = None      # finite values per time step
+        self.nonfinite = None
+        self.sum = None
+
+    def add(self, values):
+        finite = np.isfinite(values)
+        lo = np.where(finite, values, np.inf).min(axis=0)
+        hi = np.where(finite, values, -np.inf).max(axis=0)
+        if self.counts is None:
+            empty = lo > hi  # time steps without finite values yet
+            lo, hi = np.where(empty, 0.0, lo), np.where(empty, 0.0, hi)
+            margin = np.maximum(0.5 * (hi - lo), 1e-9 * np.maximum(np.abs(hi), 1.0))
+            self.lo = lo - margin
+            self.width = (hi + margin - self.lo) / self.n_bins
+            self.counts = np.zeros((values.shape[1], self.n_bins), dtype=np.int64)
+            self.total = np.zeros(values.shape[1], dtype=np.int64)
+            self.nonfinite = np.zeros(values.shape[1], dtype=np.int64)
+            self.sum = np.zeros(values.shape[1])
+        else:
+            self._widen(lo, hi)
+        safe = np.where(finite, values, self.lo)
+        idx = np.floor((safe - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.n_bins - 1, out=idx)
+        idx += np.arange(values.shape[1]) * self.n_bins
+        self.counts += np.bincount(idx[finite], minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += finite.sum(axis=0)
+        self.nonfinite += values.shape[0] - finite.sum(axis=0)
+        self.sum += np.where(finite, values, 0.0).sum(axis=0)
+
+    def _widen(self, lo, hi):
+        # Double the bin width of the time steps whose range misses [lo, hi]
+        # by merging pairs of bins. The old range becomes the upper half when
+        # values fall below it and the lower half otherwise, so the old bin
+        # edges stay edges and no count moves to a wrong bin.
+        half = self.n_bins // 2
+        while True:
+            below = lo < self.lo
+            grow = below | (hi >= self.lo + self.width * self.n_bins)
+            if not grow.any():
+                return
+            merged = self.counts[grow].reshape(-1, half, 2).sum(axis=2)
+            down = below[grow]
+            counts = np.zeros((merged.shape[0], self.n_bins), dtype=np.int64)
+            counts[down, half:] = merged[down]
+            counts[~down, :half] = merged[~down]
+            self.counts[grow] = counts
+            self.lo[grow] -= np.where(down, self.width[grow] * self.n_bins, 0.0)
+            self.width[grow] *= 2
+
+    def percentile(self, q):
+        # NaN where a time step has no finite value
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._percentile(q)
+
+    def _percentile(self, q):
+        total = self.total[:, None]
+        cdf = np.cumsum(self.counts, axis=1) / total
+        target = q / 100
+        bin_idx = np.argmax(cdf >= target, axis=1)
+        rows = np.arange(cdf.shape[0])
+        below = np.where(bin_idx > 0, cdf[rows, np.maximum(bin_idx - 1, 0)], 0.0)
+        inside = self.counts[rows, bin_idx] / total[:, 0]
+        frac = np.where(inside > 0, (target - below) / np.where(inside > 0, inside, 1), 0.5)
+        value = self.lo + (bin_idx + np.clip(frac, 0, 1)) * self.width
+        return np.where(self.total > 0, value, np.nan)
+
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sum / self.total
+
+
+def run(n_paths, mins, maxs, income, edo_params, n_months=120,
+        g_mean=0.0, g_std=0.01, r_mean=0.03, r_std=0.02,
+        edo_g_std=0.01, edo_r_std=0.01, edo_points=121,
+        percentiles=(5, 50, 95), chunk_size=20000, seed=None, progress=None):
+    """Corre n_paths trayectorias de ambos modelos y devuelve sus abanicos.
+
+    El resultado es {'annuity': fan, 'edo': fan} donde cada fan contiene
+    'times' (años), 'mean', 'percentiles' {q: array} y 'nonfinite'
+    (trayectorias no finitas por instante, que no entran a mean ni a los
+    percentiles). progress(done, n_paths), si se da, se llama después de cada
+    bloque y puede lanzar una excepción para cancelar.
+    """
+    rng = np.random.default_rng(seed)
+    edo_times = np.linspace(0, edo_params['T'], edo_points)
+    annuity_fan = _FanAccumulator()
+    edo_fan = _FanAccumulator()
+
+    done = 0
+    while done < n_paths:
+        n = min(chunk_size, n_paths - done)
+        annuity_fan.add(annuity_paths(rng, n, income, mins, maxs, n_months,
+                                      g_mean, g_std, r_mean, r_std))
+        edo_fan.add(edo_paths(rng, n, edo_params, edo_times, edo_g_std, edo_r_std))
+        done += n
+        if progress is not None:
+            progress(done, n_paths)
+
+    def summary(fan, times):
+        return {
+            'times': times,
+            'mean': fan.mean(),
+            'nonfinite': fan.nonfinite,
+            'percentiles': {q: fan.percentile(q) for q in percentiles},
+        }
+
+    return {
+        'annuity': summary(annuity_fan, np.arange(n_months + 1) / 12),
+        'edo': summary(edo_fan, edo_times),
+    }
+
+
+def plot_fan(ax, fan, label, color=None):
+    # Median line with the outer percentile band shaded
+    qs = sorted(fan['percentiles'])
+    lower, upper = fan['percentiles'][qs[0]], fan['percentiles'][qs[-1]]
+    median = fan['percentiles'].get(50, fan['mean'])
+    line, = ax.plot(fan['times'], median, color=color, label=f'{label} (P50)')
+    ax.fill_between(fan['times'], lower, upper, color=line.get_color(), alpha=0.25,
+                    label=f'{label} (P{qs[0]}-P{qs[-1]})')
+
+
+def save_fan(path, result, title='Abanico Monte Carlo del ahorro'):
+    """Guarda el abanico de ambos modelos de run() en path (png, pdf, svg...)."""
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(8, 5))
+    ax = figure.add_subplot()
+    plot_fan(ax, result['annuity'], 'Anualidad')
+    plot_fan(ax, result['edo'], 'EDO')
+    ax.set_xlabel('Tiempo (años)')
+    ax.set_ylabel('Ahorro acumulado (Bs.)')
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+    figure.savefig(path)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    df = pd.read_csv(SAMPLE_CSV)
+    mins, maxs, income = expense_ranges(df)
+    edo_params = {'I0': income, 'g': 0.05, 'c0': 50, 'c1': 0.9, 'c2': 0.1,
+                  'r': 0.03, 'A0': 161, 'T': 10}
+    result = run(100000, mins, maxs, income, edo_params, seed=0)
+    for model, fan in result.items():
+        finals = ", ".join(f"P{q}: Bs. {v[-1]:,.2f}" for q, v in fan['percentiles'].items())
+        print(f"{model}: {finals}")
+    save_fan('abanico.png', result)
+    print("Abanico guardado en abanico.png")
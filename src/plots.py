@@ -0,0 +1,77 @@
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+import instrument
+
+# Gráficas reutilizables para la interfaz.
+# Cada panel crea su Figure, su canvas y sus Line2D una sola vez; las
+# simulaciones siguientes solo cambian los datos con set_data y piden un
+# redibujado con draw_idle. Las figuras no pasan por pyplot, así que no
+# quedan registradas globalmente y se liberan junto con su frame.
+
+
+class PlotPanel:
+    @instrument.timed('PlotPanel.create')
+    def __init__(self, master, title, xlabel, ylabel, lines, figsize=(8, 5)):
+        """lines: lista de (nombre, formato, etiqueta) de las curvas."""
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        self.lines = {}
+        for name, fmt, label in lines:
+            self.lines[name], = self.ax.plot([], [], fmt, label=label)
+        self.fixed = set(self.lines)
+        self.texts = {}
+        self.bands = {}
+
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_title(title)
+        self.ax.legend()
+        self.ax.grid(True)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.redraws = 0
+
+    def alive(self):
+        return bool(self.canvas.get_tk_widget().winfo_exists())
+
+    def set_text(self, name, x, y, text):
+        # Annotation in axes coordinates, created on first use
+        if name not in self.texts:
+            self.texts[name] = self.ax.text(x, y, text, transform=self.ax.transAxes)
+        else:
+            self.texts[name].set_text(text)
+
+    def set_lines(self, lines):
+        """Curvas adicionales (nombre, formato, etiqueta): crea las nuevas y
+        quita las agregadas antes que ya no están; las del constructor quedan."""
+        wanted = {name for name, _, _ in lines}
+        for name in [n for n in self.lines if n not in self.fixed and n not in wanted]:
+            self.lines.pop(name).remove()
+        for name, fmt, label in lines:
+            if name not in self.lines:
+                self.lines[name], = self.ax.plot([], [], fmt, label=label)
+        self.ax.legend()
+
+    def set_band(self, name, x, lower, upper, label):
+        """Franja sombreada entre lower y upper, del color de la curva `name`.
+
+        fill_between no tiene set_data, así que la franja anterior se reemplaza.
+        """
+        if name in self.bands:
+            self.bands.pop(name).remove()
+        self.bands[name] = self.ax.fill_between(x, lower, upper, color=self.lines[name].get_color(),
+                                                alpha=0.25, label=label)
+        self.ax.legend()
+
+    @instrument.timed('PlotPanel.update')
+    def update(self, data):
+        """data: {nombre: (x, y)} con las curvas a actualizar."""
+        for name, (x, y) in data.items():
+            self.lines[name].set_data(x, y)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+        self.redraws += 1
+        instrument.count('plots.redraws')
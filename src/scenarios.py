@@ -0,0 +1,173 @@
+import numpy as np
+
+# Escenarios de gasto entre el mínimo y el máximo de cada categoría.
+# Con `levels` niveles por categoría (2 = solo Mín/Máx) hay levels^k
+# combinaciones para k categorías; el escenario número i corresponde a los
+# dígitos de i en base `levels`, así que cualquier rango de escenarios se
+# genera con una división entera y un producto matricial contra los
+# rangos de gasto. Para recorrer la malla completa las categorías se
+# parten en dos mitades cuyos gastos parciales se tabulan una vez; el
+# gasto de cada escenario es la suma de una entrada de cada tabla. También
+# se pueden sortear gastos uniformes en [Mín, Máx]. Los escenarios se
+# procesan por bloques y solo se acumula un histograma del ahorro, cuyo
+# rango se conoce de antemano. Las tablas parciales tienen unas
+# sqrt(levels^k) entradas, así que la malla completa solo se recorre hasta
+# MAX_SCENARIOS escenarios; con más, run() sortea FALLBACK_SAMPLES.
+
+MAX_SCENARIOS = 2**20
+FALLBACK_SAMPLES = 10**6
+
+
+def scenario_count(k, levels=2):
+    return int(levels) ** int(k)  # Python int: no int64 overflow
+
+
+def scenario_block(mins, maxs, income, start, stop, levels=2):
+    """Escenarios [start, stop) de la malla: (niveles, ahorro).
+
+    niveles tiene forma (stop - start, k) con el nivel elegido en cada
+    categoría (0 = Mín, levels - 1 = Máx); ahorro = ingreso - gasto total.
+    """
+    if levels < 2:
+        raise ValueError("levels debe ser al menos 2")
+    mins = np.asarray(mins, dtype=float)
+    if scenario_count(mins.size, levels) > np.iinfo(np.int64).max:
+        raise ValueError(f"{levels}^{mins.size} escenarios no se pueden numerar")
+    step = (np.asarray(maxs, dtype=float) - mins) / (levels - 1)
+    place = levels ** np.arange(mins.size, dtype=np.int64)
+    digits = (np.arange(start, stop, dtype=np.int64)[:, None] // place) % levels
+    return digits, income - (mins.sum() + digits @ step)
+
+
+def _partial_totals(mins, step, levels):
+    # Expense of every combination of levels for these categories
+    _, savings = scenario_block(mins, mins + step * (levels - 1), 0.0, 0,
+                                scenario_count(mins.size, levels), levels)
+    return -savings
+
+
+def sample_savings(rng, n, mins, maxs, income):
+    """Ahorro de n escenarios con gastos uniformes en [Mín, Máx]."""
+    mins = np.asarray(mins, dtype=float)
+    spread = np.asarray(maxs, dtype=float) - mins
+    return income - (mins.sum() + rng.random((n, mins.size)) @ spread)
+
+
+class SavingsHistogram:
+    """Histograma del ahorro en [lo, hi] con media y desvío acumulados."""
+
+    def __init__(self, lo, hi, n_bins=1000):
+        if hi <= lo:
+            hi = lo + 1.0
+        self.edges = np.linspace(lo, hi, n_bins + 1)
+        self.lo, self.width = lo, (hi - lo) / n_bins
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.total = 0
+        self.shift = (lo + hi) / 2  # moments around the middle keep std accurate
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.deficit = 0
+
+    def add(self, savings):
+        idx = np.floor((savings - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.counts.size - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.counts.size)
+        self.total += savings.size
+        centered = savings - self.shift
+        self.sum += float(centered.sum())
+        self.sum_sq += float(np.dot(centered, centered))
+        self.deficit += int(np.count_nonzero(savings < 0))
+
+    def quantile(self, q):
+        """Cuantil q (0-100), interpolado linealmente dentro del bin."""
+        cdf = np.cumsum(self.counts) / self.total
+        target = q / 100
+        i = int(np.searchsorted(cdf, target))
+        i = min(i, self.counts.size - 1)
+        below = cdf[i - 1] if i > 0 else 0.0
+        inside = self.counts[i] / self.total
+        frac = (target - below) / inside if inside > 0 else 0.5
+        return self.lo + (i + min(max(frac, 0.0), 1.0)) * self.width
+
+    def mean(self):
+        return self.shift + self.sum / self.total
+
+    def std(self):
+        centered_mean = self.sum / self.total
+        return float(np.sqrt(max(self.sum_sq / self.total - centered_mean ** 2, 0.0)))
+
+
+def run(mins, maxs, income, levels=2, n_samples=None, n_bins=1000,
+        quantiles=(5, 25, 50, 75, 95), chunk_size=2**18, seed=None, progress=None,
+        max_scenarios=MAX_SCENARIOS):
+    """Distribución del ahorro sobre los escenarios de gasto.
+
+    Sin n_samples recorre las levels^k combinaciones, o sortea
+    FALLBACK_SAMPLES escenarios uniformes si son más de max_scenarios; con
+    n_samples sortea esa cantidad. Devuelve un dict con 'n_scenarios',
+    'sampled', 'min_savings', 'max_savings', 'mean', 'std', 'p_deficit'
+    (fracción con ahorro negativo), 'quantiles' {q: valor}, 'edges' y
+    'counts' del histograma.
+    """
+    if levels < 2:
+        raise ValueError("levels debe ser al menos 2")
+    mins = np.asarray(mins, dtype=float)
+    maxs = np.asarray(maxs, dtype=float)
+    if n_samples is None and scenario_count(mins.size, levels) > max_scenarios:
+        n_samples = FALLBACK_SAMPLES
+    lowest, highest = income - maxs.sum(), income - mins.sum()
+    hist = SavingsHistogram(lowest, highest, n_bins)
+
+    rng = np.random.default_rng(seed)
+    if n_samples is None:
+        # Scenario i = low + n_low * high, with low/high indexing the two halves
+        total = scenario_count(mins.size, levels)
+        half = mins.size // 2
+        step = (maxs - mins) / (levels - 1)
+        low_totals = _partial_totals(mins[:half], step[:half], levels)
+        high_totals = _partial_totals(mins[half:], step[half:], levels)
+        n_low = low_totals.size
+    else:
+        total = n_samples
+    done = 0
+    while done < total:
+        stop = min(done + chunk_size, total)
+        if n_samples is not None:
+            savings = sample_savings(rng, stop - done, mins, maxs, income)
+        else:
+            idx = np.arange(done, stop, dtype=np.int64)
+            savings = income - (low_totals[idx % n_low] + high_totals[idx // n_low])
+        hist.add(savings)
+        done = stop
+        if progress is not None:
+            progress(done, total)
+
+    return {
+        'n_scenarios': total,
+        'sampled': n_samples is not None,
+        'min_savings': lowest,
+        'max_savings': highest,
+        'mean': hist.mean(),
+        'std': hist.std(),
+        'p_deficit': hist.deficit / total,
+        'quantiles': {q: hist.quantile(q) for q in quantiles},
+        'edges': hist.edges,
+        'counts': hist.counts,
+    }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    from expenses import SAMPLE_CSV
+    from montecarlo import expense_ranges
+
+    df = pd.read_csv(SAMPLE_CSV)
+    mins, maxs, income = expense_ranges(df)
+    income = income or 3000.0
+    for label, kwargs in (('Mín/Máx (2^k)', {}), ('3 niveles (3^k)', {'levels': 3}),
+                          ('Uniforme (10^6)', {'n_samples': 10**6, 'seed': 0})):
+        result = run(mins, maxs, income, **kwargs)
+        qs = ", ".join(f"P{q}: {v:,.0f}" for q, v in result['quantiles'].items())
+        print(f"{label}: {result['n_scenarios']:,} escenarios, {qs}, "
+              f"déficit {result['p_deficit']:.1%}")
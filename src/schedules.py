@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+import edo
+
+# Parámetros que cambian mes a mes, leídos de series históricas.
+# El archivo es un CSV con una fila por mes (columna opcional 'mes', desde
+# 0) y alguna de estas columnas:
+#   tasa       tasa de rendimiento anual (decimal)
+#   ingreso    nivel de ingreso; se usa como índice relativo al primer mes
+#   inflacion  inflación anual (decimal), para deflactar
+#   deuda      pago mensual de deudas (Bs.), p.ej. loans.monthly_payments
+# Cada instante de la malla de integración se asigna a su mes con un
+# índice calculado una sola vez (grid_lookup); después los parámetros de
+# todos los pasos se obtienen indexando arrays. Los modelos se resuelven
+# de forma exacta con parámetros constantes dentro de cada paso, usando
+# productos y sumas acumuladas en lugar de un bucle por paso, y siguen
+# vectorizados sobre los hogares: las series son comunes y los demás
+# parámetros pueden ser arrays con un valor por hogar.
+# La deuda entra distinto en cada modelo: en la anualidad el aporte P ya
+# descuenta el pago del primer mes (es el ahorro de la planilla), así que
+# lo que se deja de pagar después se suma al aporte; en el modelo EDO el
+# pago es una salida aparte del consumo: dA/dt = I - C - deuda(t) + r A.
+
+MONTH_COL = 'mes'
+RATE_COL = 'tasa'
+INCOME_COL = 'ingreso'
+INFLATION_COL = 'inflacion'
+DEBT_COL = 'deuda'
+SERIES_COLUMNS = (RATE_COL, INCOME_COL, INFLATION_COL, DEBT_COL)
+MONTH = 1 / 12
+
+
+def load_series(path, chunksize=100000):
+    """Series mensuales del CSV: {columna: array}, ordenadas por mes.
+
+    Solo se leen las columnas conocidas, por bloques y como float64.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in (MONTH_COL,) + SERIES_COLUMNS if c in header]
+    if not any(c in SERIES_COLUMNS for c in usecols):
+        raise ValueError(f"El archivo debe tener al menos una de las columnas: {', '.join(SERIES_COLUMNS)}")
+    chunks = list(pd.read_csv(path, usecols=usecols, dtype='float64', chunksize=chunksize))
+    columns = {c: np.concatenate([chunk[c].to_numpy() for chunk in chunks]) for c in usecols}
+    if MONTH_COL in columns:
+        order = np.argsort(columns.pop(MONTH_COL), kind='stable')
+        columns = {c: values[order] for c, values in columns.items()}
+    return columns
+
+
+def grid_lookup(n_values, times, t_start=0.0):
+    """Índice del mes de cada instante de `times` (años) en una serie de n_values meses.
+
+    Antes del inicio se usa el primer mes y después del final el último.
+    """
+    months = np.floor((np.asarray(times, dtype=float) - t_start) / MONTH + 1e-9).astype(np.int64)
+    return np.clip(months, 0, n_values - 1)
+
+
+def vf_trajectory(P, rates, n_months, contributions=None, spread=0.0, debt=None):
+    """Saldo mes a mes de una anualidad con tasa anual variable.
+
+    rates es la serie mensual de tasas anuales; spread (por hogar) se suma
+    a la tasa. contributions, si se da, escala el aporte de cada mes
+    relativo a su primer valor (p.ej. la serie de ingreso). debt, si se
+    da, es el pago mensual de deudas: el aporte crece en debt[0] - debt[m].
+    Devuelve (months, values) con values de forma (N, n_months + 1).
+    """
+    P = np.atleast_1d(np.asarray(P, dtype=float))[:, None]
+    spread = np.atleast_1d(np.asarray(spread, dtype=float))[:, None]
+    rates = np.asarray(rates, dtype=float)
+    months = np.arange(n_months + 1)
+    starts = (months[1:] - 1) * MONTH  # each payment month, by its start
+    growth = 1 + (rates[grid_lookup(rates.size, starts)] + spread) / 12
+    paid = P
+    if contributions is not None:
+        contributions = np.asarray(contributions, dtype=float)
+        paid = P * contributions[grid_lookup(contributions.size, starts)] / contributions[0]
+    if debt is not None:
+        debt = np.asarray(debt, dtype=float)
+        paid = paid + (debt[0] - debt[grid_lookup(debt.size, starts)])
+    growth, paid = np.broadcast_arrays(growth, paid)
+
+    # B_m = B_{m-1} (1 + r_m) + paid_m  =>  B_m / G_m = sum_j paid_j / G_j, G_m = prod (1 + r_i)
+    G = np.cumprod(growth, axis=-1)
+    values = np.zeros(G.shape[:-1] + (n_months + 1,))
+    values[:, 1:] = G * np.cumsum(paid / G, axis=-1)
+    return months, values
+
+
+def solve(I0, g, c0, c1, c2, r, A0, T, series, t0=0.0, dt=MONTH):
+    """Modelo EDO con tasa y/o ingreso tomados de series mensuales.
+
+    Si series tiene 'tasa', r(t) sigue esa serie (el r de cada hogar se
+    ignora); si tiene 'ingreso', I(t) = I0 * ingreso(t) / ingreso[0] en
+    lugar de I0 e^(g t); si tiene 'deuda', ese pago se descuenta del
+    ahorro cada mes. La malla es la de edo.solve: grid_steps(T, t0, dt)
+    pasos iguales de t0 a T. Dentro de cada paso los parámetros se toman
+    en el punto medio y se mantienen constantes, y el paso se resuelve de
+    forma exacta. Devuelve (times, A, I, C) igual que edo.solve.
+    """
+    I0, g, c0, c1, c2, r, A0 = (p[:, None] for p in edo.as_batch(I0, g, c0, c1, c2, r, A0))
+    g, c2, r = _common(g), _common(c2), _common(r)
+    n_steps = edo.grid_steps(T, t0, dt)
+    times = np.linspace(t0, T, n_steps + 1)
+    h = np.diff(times)  # dt stretched so the grid ends at T
+    mid = times[:-1] + h / 2
+
+    if RATE_COL in series:
+        rates = series[RATE_COL]
+        r_steps = rates[grid_lookup(rates.size, mid)][None, :]
+    else:
+        r_steps = r
+    if INCOME_COL in series:
+        income = series[INCOME_COL]
+        relative = income / income[0]
+        growth_mid = relative[grid_lookup(income.size, mid)][None, :]
+        growth_grid = relative[grid_lookup(income.size, times)][None, :]
+    else:
+        growth_mid = np.exp(g * mid)
+        growth_grid = np.exp(g * times)
+
+    if DEBT_COL in series:
+        debt = np.asarray(series[DEBT_COL], dtype=float)
+        debt_mid = debt[grid_lookup(debt.size, mid)][None, :]
+    else:
+        debt_mid = None
+
+    # Exact step with constant k and income: A' = e^(k h) A + ((1 - c1) I - c0) h phi(k h).
+    # With G the running product of e^(k h), A = G A0 + sum_j f_j G / G_j, which splits
+    # into curves shared by all households whenever k and the income path are common.
+    k = c2 + r_steps
+    shape = (k.shape[0], n_steps)
+    weight = np.broadcast_to(h * edo._phi(k * h), shape)
+    G = np.cumprod(np.broadcast_to(np.exp(k * h), shape), axis=-1)
+    income_part = G * np.cumsum(growth_mid * weight / G, axis=-1)
+    fixed_part = G * np.cumsum(weight / G, axis=-1)
+    A_values = np.empty((I0.shape[0], n_steps + 1))
+    A_values[:, 0] = A0[:, 0]
+    A_values[:, 1:] = G * A0 + (1 - c1) * I0 * income_part - c0 * fixed_part
+    if debt_mid is not None:
+        A_values[:, 1:] -= G * np.cumsum(debt_mid * weight / G, axis=-1)
+    I_values = I0 * growth_grid
+    C_values = c0 + c1 * I_values - c2 * A_values
+    return times, A_values, I_values, C_values
+
+
+def _common(values):
+    # A single row when every household has the same value, so the curves
+    # built from it are computed once
+    return values[:1] if values.shape[0] > 1 and (values == values[:1]).all() else values
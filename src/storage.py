@@ -0,0 +1,95 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (only needed by pandas' parquet/feather IO)
+except ImportError:
+    pyarrow = None
+
+# Almacenamiento binario de tablas de gastos y trayectorias.
+# Las tablas se guardan según la extensión: .parquet y .feather con
+# pyarrow, .npz con NumPy y .csv como antes. Si pyarrow no está instalado,
+# .parquet/.feather se guardan como .npz junto al nombre pedido, con un
+# aviso; save_table devuelve la ruta real para mostrarla.
+# Las trayectorias (hogares x tiempo) se guardan siempre en .npz con sus
+# arrays float64 tal cual, sin pasar por texto.
+
+TABLE_EXTENSIONS = ('.parquet', '.feather', '.npz', '.csv')
+FILETYPES = [
+    ("CSV Files", "*.csv"),
+    ("Parquet Files", "*.parquet"),
+    ("Feather Files", "*.feather"),
+    ("NumPy Files", "*.npz"),
+    ("All Files", "*.*"),
+]
+
+
+def _resolve(path):
+    # Where a table is really stored, given the requested name
+    root, ext = os.path.splitext(path)
+    ext = ext.lower()
+    if ext in ('.parquet', '.feather') and pyarrow is None:
+        warnings.warn(f"pyarrow no está instalado: se usa {root}.npz en lugar de {path}",
+                      stacklevel=3)
+        return root + '.npz', '.npz'
+    return path, ext
+
+
+def save_table(df, path):
+    """Guarda df según la extensión de path y devuelve la ruta usada."""
+    path, ext = _resolve(path)
+    if ext == '.parquet':
+        df.to_parquet(path, index=False)
+    elif ext == '.feather':
+        df.reset_index(drop=True).to_feather(path)
+    elif ext == '.npz':
+        columns = {f'col_{i}': df[c].to_numpy(
+                       dtype=None if pd.api.types.is_numeric_dtype(df[c]) else str)
+                   for i, c in enumerate(df.columns)}
+        np.savez(path, __columns__=np.array(df.columns, dtype=str), **columns)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def load_table(path):
+    path, ext = _resolve(path)
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.feather':
+        return pd.read_feather(path)
+    if ext == '.npz':
+        with np.load(path) as data:
+            names = data['__columns__']
+            return pd.DataFrame({str(name): data[f'col_{i}'] for i, name in enumerate(names)})
+    return pd.read_csv(path)
+
+
+def save_trajectories(path, times, params=None, **arrays):
+    """Guarda trayectorias (N, len(times)), p.ej. A=..., I=..., C=...
+
+    params es un dict opcional de arrays (N,) con los parámetros por hogar.
+    """
+    times = np.asarray(times, dtype=float)
+    payload = {'times': times}
+    for name, values in arrays.items():
+        values = np.asarray(values, dtype=float)
+        if values.shape[-1] != times.size:
+            raise ValueError(f"'{name}' no coincide con la malla de tiempos")
+        payload[name] = values
+    for name, values in (params or {}).items():
+        payload[f'param_{name}'] = np.asarray(values, dtype=float)
+    np.savez(path, **payload)
+    return path
+
+
+def load_trajectories(path):
+    """(times, arrays, params) tal como se guardaron con save_trajectories."""
+    with np.load(path) as data:
+        result = {name: data[name] for name in data.files}
+    times = result.pop('times')
+    params = {k[len('param_'):]: result.pop(k) for k in list(result) if k.startswith('param_')}
+    return times, result, params
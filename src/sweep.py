@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import edo
+
+# Barrido de parámetros del modelo EDO sobre una malla cartesiana.
+# La malla se parte en bloques de índices [start, stop) que se resuelven en
+# paralelo con ProcessPoolExecutor. Cada bloque se guarda en su propio
+# archivo dentro de out_dir; al reanudar un barrido interrumpido se omiten
+# los bloques que ya tienen archivo.
+
+MANIFEST = 'sweep.json'
+TABLE = 'sweep.csv'
+
+
+def grid_size(ranges):
+    return int(np.prod([len(v) for v in ranges.values()]))
+
+
+def grid_params(ranges, base_params, start, stop):
+    """Parámetros de los puntos [start, stop) de la malla, como arrays."""
+    names = list(ranges)
+    shape = [len(ranges[n]) for n in names]
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    params = {n: np.full(stop - start, float(base_params[n])) for n in edo.PARAM_NAMES}
+    for name, i in zip(names, idx):
+        params[name] = np.asarray(ranges[name], dtype=float)[i]
+    return params
+
+
+def _chunk_path(out_dir, chunk):
+    return os.path.join(out_dir, f'chunk_{chunk:06d}.csv')
+
+
+def _run_chunk(out_dir, chunk, ranges, base_params, T, start, stop, method, dt):
+    params = grid_params(ranges, base_params, start, stop)
+    args = [params[n] for n in edo.PARAM_NAMES]
+    if method == 'analytic':
+        A_final, _, _ = edo.simulate_analytic(*args, [T])
+        A_final = A_final[:, -1]
+    else:
+        _, A_values, _, _ = edo.solve(*args, T, dt=dt, method=method)
+        A_final = A_values[:, -1]
+
+    table = pd.DataFrame(params)
+    table.insert(0, 'index', np.arange(start, stop))
+    table['A_final'] = A_final
+
+    # Write then rename so a killed worker never leaves a partial chunk
+    path = _chunk_path(out_dir, chunk)
+    tmp = path + '.tmp'
+    table.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return chunk
+
+
+def run_sweep(ranges, base_params, out_dir, T=None, method='analytic', dt=0.1,
+              chunk_size=50000, max_workers=None, progress=None):
+    """Resuelve la EDO en cada punto de la malla cartesiana de `ranges`.
+
+    ranges: {nombre: valores} para cualquier subconjunto de edo.PARAM_NAMES
+    (típicamente c1, c2, g, r); el resto se toma de base_params.
+    Devuelve la ruta de la tabla combinada (out_dir/sweep.csv).
+    """
+    T = float(base_params['T'] if T is None else T)
+    ranges = {n: [float(v) for v in np.atleast_1d(vals)] for n, vals in ranges.items()}
+    unknown = set(ranges) - set(edo.PARAM_NAMES)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {sorted(unknown)}")
+
+    config = {
+        'ranges': ranges,
+        'base_params': {n: float(base_params[n]) for n in edo.PARAM_NAMES},
+        'T': T, 'method': method, 'dt': dt, 'chunk_size': chunk_size,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != config:
+                raise ValueError(f"{out_dir} contiene un barrido con otra configuración")
+    else:
+        with open(manifest_path, 'w') as f:
+            json.dump(config, f, indent=2)
+
+    total = grid_size(ranges)
+    n_chunks = -(-total // chunk_size)
+    pending = [c for c in range(n_chunks) if not os.path.exists(_chunk_path(out_dir, c))]
+
+    done = n_chunks - len(pending)
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_run_chunk, out_dir, c, ranges, config['base_params'], T,
+                            c * chunk_size, min((c + 1) * chunk_size, total), method, dt)
+                for c in pending
+            ]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if progress is not None:
+                    progress(done, n_chunks)
+
+    # Stream the chunk files into a single table, in grid order
+    table_path = os.path.join(out_dir, TABLE)
+    with open(table_path, 'w', newline='') as out:
+        for c in range(n_chunks):
+            with open(_chunk_path(out_dir, c)) as f:
+                header = f.readline()
+                if c == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    return table_path
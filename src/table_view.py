@@ -0,0 +1,132 @@
+from tkinter import ttk
+
+import instrument
+
+# Tabla virtualizada sobre una expenses.Table.
+# El Treeview tiene siempre `height` filas fijas que se reutilizan: al
+# desplazarse solo se reescriben los valores de las filas visibles, leídos
+# directamente de las listas de cada columna; las filas sobrantes se
+# ocultan con detach. El orden y el filtro son listas de posiciones, así
+# que la tabla nunca se copia.
+
+
+class VirtualTable:
+    def __init__(self, master, columns, height=15, filter_column=None):
+        self.columns = list(columns)
+        self.height = height
+        self.filter_column = filter_column if filter_column is not None else self.columns[0]
+        self.table = None
+        self.order = []               # row positions in display order
+        self.view = self.order        # order after filtering
+        self.offset = 0
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter_text = ''
+
+        self.frame = ttk.Frame(master)
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, show="headings",
+                                 height=height, selectmode="browse")
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=150, anchor="center")
+        self.item_ids = [self.tree.insert("", "end", values=()) for _ in range(height)]
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(fill="both", expand=True)
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_data(self, table):
+        """Muestra table. Conserva el orden y el filtro actuales."""
+        self.table = table
+        self.order = list(range(len(table)))
+        if self.sort_column is not None:
+            self._sort()
+        self._apply_filter()
+
+    def row_of(self, item_id):
+        """Posición en la tabla de la fila mostrada en item_id, o None."""
+        if item_id not in self.item_ids:
+            return None
+        pos = self.offset + self.item_ids.index(item_id)
+        return self.view[pos] if pos < len(self.view) else None
+
+    def refresh_row(self, row):
+        # Rewrite a single row in place if it is currently visible
+        visible = self.view[self.offset:self.offset + self.height]
+        if row in visible:
+            self.tree.item(self.item_ids[visible.index(row)], values=self._values(row))
+
+    def sort_by(self, column, descending=None):
+        if descending is None:
+            descending = not self.sort_descending if column == self.sort_column else False
+        self.sort_column = column
+        self.sort_descending = descending
+        self._sort()
+        self._apply_filter()
+
+    def set_filter(self, text):
+        self.filter_text = text.strip()
+        self._apply_filter()
+
+    def yview(self, *args):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if args[0] == 'moveto':
+            offset = int(float(args[1]) * len(self.view))
+        else:
+            step = int(args[1]) * (self.height if args[2] == 'pages' else 1)
+            offset = self.offset + step
+        self._scroll_to(offset)
+
+    def _on_wheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self._scroll_to(self.offset - 3)
+        else:
+            self._scroll_to(self.offset + 3)
+        return "break"
+
+    def _sort(self):
+        keys = self.table.column(self.sort_column)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.order = order[::-1] if self.sort_descending else order
+
+    def _apply_filter(self):
+        if self.table is None:
+            return
+        if self.filter_text:
+            text = self.filter_text.lower()
+            values = self.table.column(self.filter_column)
+            self.view = [row for row in self.order if text in str(values[row]).lower()]
+        else:
+            self.view = self.order
+        self._scroll_to(0 if self.filter_text else self.offset)
+
+    def _values(self, row):
+        return tuple(self.table.get(row, col) for col in self.columns)
+
+    def _scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.view) - self.height))
+        self._render()
+
+    @instrument.timed('VirtualTable.render')
+    def _render(self):
+        arrays = [self.table.column(col) for col in self.columns] if self.table is not None else []
+        for k, item_id in enumerate(self.item_ids):
+            pos = self.offset + k
+            if pos < len(self.view):
+                row = self.view[pos]
+                self.tree.item(item_id, values=tuple(a[row] for a in arrays))
+                self.tree.move(item_id, "", k)
+                instrument.count('table.rows_rendered')
+            else:
+                self.tree.detach(item_id)
+        n = len(self.view)
+        if n > self.height:
+            self.scrollbar.set(self.offset / n, (self.offset + self.height) / n)
+        else:
+            self.scrollbar.set(0, 1)
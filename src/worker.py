@@ -0,0 +1,84 @@
+import queue
+import threading
+
+# Ejecución de simulaciones fuera del hilo de Tk.
+# La función corre en un hilo y se comunica con la interfaz solo a través
+# de una cola; la interfaz la revisa con after() y actualiza la barra de
+# progreso, de modo que el mainloop nunca se bloquea.
+
+POLL_MS = 16  # ~60 fps
+
+
+class Cancelled(Exception):
+    pass
+
+
+class BackgroundTask:
+    """Ejecuta fn(*args, progress=..., **kwargs) en un hilo aparte.
+
+    fn recibe un callback progress(done, total); al cancelar, la siguiente
+    llamada a progress lanza Cancelled y la tarea termina.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def progress(self, done, total):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        self.messages.put(('progress', done / total if total else 1.0))
+
+    def _run(self):
+        try:
+            result = self.fn(*self.args, progress=self.progress, **self.kwargs)
+        except Cancelled:
+            self.messages.put(('cancelled', None))
+        except Exception as e:
+            self.messages.put(('error', e))
+        else:
+            if self.cancel_event.is_set():
+                self.messages.put(('cancelled', None))
+            else:
+                self.messages.put(('done', result))
+
+
+def poll(widget, task, on_done, on_progress=None, on_error=None, on_cancel=None,
+         interval=POLL_MS):
+    """Revisa la cola de `task` desde el mainloop de `widget` hasta que
+    termine, llamando al callback que corresponda."""
+    latest = None
+    try:
+        while True:
+            kind, payload = task.messages.get_nowait()
+            if kind == 'progress':
+                latest = payload
+                continue
+            if kind == 'done':
+                on_done(payload)
+            elif kind == 'error' and on_error is not None:
+                on_error(payload)
+            elif kind == 'cancelled' and on_cancel is not None:
+                on_cancel()
+            return
+    except queue.Empty:
+        pass
+    if latest is not None and on_progress is not None:
+        on_progress(latest)
+    widget.after(interval, poll, widget, task, on_done, on_progress, on_error, on_cancel,
+                 interval)
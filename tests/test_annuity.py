@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import annuity
+
+
+def baseline_fv(P, r_annual, n_months):
+    # Scalar formula of the original interface
+    r_monthly = r_annual / 12
+    if r_monthly == 0:
+        return P * n_months
+    return P * ((1 + r_monthly) ** n_months - 1) / r_monthly
+
+
+@pytest.mark.parametrize('P, r_annual, n_months', [
+    (161, 0.03, 120), (500, 0.12, 360), (161, 0.0, 120), (100, -0.05, 60), (50, 0.03, 0)])
+def test_future_value_matches_baseline(P, r_annual, n_months):
+    np.testing.assert_allclose(annuity.future_value(P, r_annual, n_months),
+                               baseline_fv(P, r_annual, n_months), rtol=1e-9)
+
+
+def test_tiny_rate_tends_to_zero_rate():
+    # The baseline formula loses digits to cancellation here; expm1/log1p do not
+    np.testing.assert_allclose(annuity.future_value(100, 1e-12, 12), 1200.0, rtol=1e-12)
+
+
+def test_future_value_broadcasts():
+    P, r, n = np.array([161.0, 300.0]), np.array([[0.0], [0.03]]), 120
+    expected = [[baseline_fv(p, rate, n) for p in P] for rate in r[:, 0]]
+    np.testing.assert_allclose(annuity.future_value(P, r, n), expected, rtol=1e-12)
+
+
+def test_trajectory_holds_final_value_after_term():
+    months, values = annuity.trajectory([161.0, 161.0], [0.03, 0.0], [24, 12])
+    np.testing.assert_array_equal(months, np.arange(25))
+    for row, (r, n) in enumerate([(0.03, 24), (0.0, 12)]):
+        expected = [baseline_fv(161.0, r, min(m, n)) for m in months]
+        np.testing.assert_allclose(values[row], expected, rtol=1e-12)
+
+
+def test_yearly_curve_matches_baseline():
+    times = np.linspace(0, 10, 11)
+    for r in (0.03, 0.0):
+        expected = [161 * 12 * t if r == 0 else 161 * 12 * ((1 + r) ** t - 1) / r for t in times]
+        np.testing.assert_allclose(annuity.yearly_curve(161, r, times), expected, rtol=1e-12, atol=1e-9)
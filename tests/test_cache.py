@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pytest
+
+import cache
+from cache import ResultCache, make_key
+
+
+def test_key_depends_on_solver_version(monkeypatch):
+    key = make_key('edo', {'I0': 2061, 'g': 0.05}, method='analytic')
+    assert key == make_key('edo', {'g': 0.05, 'I0': 2061.0}, method='analytic')
+    monkeypatch.setattr(cache, 'SOLVER_VERSION', cache.SOLVER_VERSION + 1)
+    assert key != make_key('edo', {'I0': 2061, 'g': 0.05}, method='analytic')
+
+
+def test_returned_arrays_are_read_only(tmp_path):
+    results = ResultCache(path=str(tmp_path))
+    stored = results.put('a', (np.arange(3.0), np.ones(2)))
+    for value in (stored, results.get('a'), ResultCache(path=str(tmp_path)).get('a')):
+        with pytest.raises(ValueError):
+            value[0][0] = 1.0
+
+
+def test_put_leaves_the_callers_arrays_writable():
+    array = np.arange(3.0)
+    stored = ResultCache().put('a', (array,))
+    array[0] = 5.0
+    assert not stored[0].flags.writeable
+
+
+def test_disk_is_pruned_to_budget(tmp_path):
+    array = np.zeros(1000)
+    results = ResultCache(path=str(tmp_path), max_disk_bytes=3 * array.nbytes)
+    for i in range(6):
+        results.put(f'k{i}', (array,))
+        os.utime(results._file(f'k{i}'), (i, i))
+    files = sorted(os.listdir(tmp_path))
+    assert sum(os.path.getsize(tmp_path / f) for f in files) <= 3 * array.nbytes
+    assert 'k5.npz' in files and 'k0.npz' not in files
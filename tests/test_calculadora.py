@@ -0,0 +1,23 @@
+import json
+
+import calculadora
+
+
+def test_default_ledger_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for command in ('gastos', 'escenarios'):
+        assert calculadora.main([command, '-o', f'{command}.json']) == 0
+        with open(tmp_path / f'{command}.json', encoding='utf-8') as f:
+            assert json.load(f)['params']['csv'] == calculadora.SAMPLE_CSV
+
+
+def test_config_reaches_escenarios_and_montecarlo(tmp_path):
+    config = tmp_path / 'config.json'
+    config.write_text(json.dumps({'paths': 10, 'months': 12, 'seed': 0, 'levels': 3, 'income': 3000}))
+    for command, key, expected in (('montecarlo', 'paths', 10), ('escenarios', 'levels', 3)):
+        out = tmp_path / f'{command}.json'
+        assert calculadora.main([command, '--config', str(config), '-o', str(out)]) == 0
+        with open(out, encoding='utf-8') as f:
+            result = json.load(f)
+        assert result['params'][key] == expected and result['params']['income'] == 3000
+    assert json.loads((tmp_path / 'montecarlo.json').read_text())['summary']['paths'] == 10
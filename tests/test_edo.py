@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+import edo
+
+PARAMS = (2061.0, 0.05, 50.0, 0.9, 0.1, 0.03, 161.0)
+
+
+@pytest.mark.parametrize('method', ['analytic', 'rk4', 'rk45'])
+def test_zero_horizon_returns_initial_state(method):
+    times, A, I, _ = edo.solve(*PARAMS, 0.0, method=method)
+    np.testing.assert_array_equal(times, [0.0])
+    np.testing.assert_allclose(A, [[PARAMS[-1]]])
+    np.testing.assert_allclose(I, [[PARAMS[0]]])
+
+
+def test_rk45_info_matches_dense_solution():
+    *result, info = edo.solve(*PARAMS, 10, method='rk45', return_info=True)
+    solution = edo.simulate_rk45(*PARAMS, 10)
+    assert info['nfev'] == solution.nfev and info['n_steps'] == solution.n_steps
+    assert info['n_rejected'] == solution.n_rejected
+    assert 0 < info['max_error'] <= 1
+    np.testing.assert_allclose(info['error_estimate'], solution.error_estimate)
+    _, A_ref, _, _ = edo.solve(*PARAMS, 10)
+    np.testing.assert_allclose(result[1], A_ref, rtol=1e-6)
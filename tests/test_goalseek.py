@@ -0,0 +1,20 @@
+import numpy as np
+
+import goalseek
+
+PARAMS = {'I0': 2061.0, 'g': 0.05, 'c0': 50.0, 'c1': 0.9, 'c2': 0.1, 'r': 0.03, 'A0': 161.0}
+
+
+def test_affine_solution_reproduces_target():
+    known = {k: v for k, v in PARAMS.items() if k != 'c1'}
+    c1 = goalseek.solve_edo([3000.0, 4000.0], 'c1', known, 10)
+    trial = dict(PARAMS, c1=c1)
+    np.testing.assert_allclose(goalseek.final_savings(trial, 10), [3000.0, 4000.0])
+
+
+def test_affine_solution_outside_domain_is_nan():
+    # c1 < 0 or I0 <= 0 would be needed: no meaningful solution
+    known = {k: v for k, v in PARAMS.items() if k != 'c1'}
+    assert np.isnan(goalseek.solve_edo(100000.0, 'c1', known, 10)).all()
+    known = {k: v for k, v in PARAMS.items() if k != 'I0'}
+    assert np.isnan(goalseek.solve_edo(-10000.0, 'I0', known, 10)).all()
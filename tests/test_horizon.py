@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pytest
+
+import edo
+import horizon
+
+PARAMS = {'I0': 2061.0, 'g': 0.05, 'c0': 50.0, 'c1': 0.9, 'c2': 0.1, 'r': 0.03, 'A0': 161.0}
+
+
+@pytest.mark.parametrize('method', ['analytic', 'rk4'])
+@pytest.mark.parametrize('first, second', [(7, 9.7), (10, 20), (20, 10)])
+def test_extension_reproduces_full_run(method, first, second):
+    settings = {'t0': 0.0, 'dt': 0.1, 'method': method}
+    cache = horizon.HorizonCache()
+    cache.edo(dict(PARAMS, T=first), settings)
+    times, A, I, C = cache.edo(dict(PARAMS, T=second), settings)
+    full = edo.solve(*PARAMS.values(), second, dt=0.1, method=method)
+    np.testing.assert_allclose(times, full[0], rtol=1e-12, atol=1e-12)
+    for values, expected in zip((A, I, C), full[1:]):
+        np.testing.assert_allclose(values, expected, rtol=1e-10)
+    assert cache.misses == 1 and cache.hits + cache.extensions == 1
+
+
+def test_off_grid_horizon_is_a_miss():
+    settings = {'t0': 0.0, 'dt': 0.1, 'method': 'analytic'}
+    cache = horizon.HorizonCache()
+    cache.edo(dict(PARAMS, T=10), settings)
+    times, A, _, _ = cache.edo(dict(PARAMS, T=20.05), settings)
+    full_times, full_A, _, _ = edo.solve(*PARAMS.values(), 20.05, dt=0.1)
+    np.testing.assert_array_equal(times, full_times)
+    np.testing.assert_array_equal(A, full_A)
+    assert (cache.misses, cache.extensions) == (2, 0)
+    assert cache.edo(dict(PARAMS, T=10), settings)[0].size == 101 and cache.hits == 1
+
+
+def test_vf_does_not_wait_for_a_running_edo(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    solve = edo.solve
+
+    def slow_solve(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(edo, 'solve', slow_solve)
+    cache = horizon.HorizonCache()
+    worker = threading.Thread(target=cache.edo, args=(dict(PARAMS, T=10), {'dt': 0.1}))
+    worker.start()
+    try:
+        assert started.wait(5)
+        fv, times, curve = cache.vf({'P': 161.0, 'r_annual': 0.03, 'n_months': 120})
+        assert times.size == 121 and worker.is_alive()
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_returned_views_are_read_only():
+    cache = horizon.HorizonCache()
+    cache.edo(dict(PARAMS, T=10), {'dt': 0.1})
+    for result in (cache.edo(dict(PARAMS, T=10), {'dt': 0.1}),
+                   cache.vf({'P': 161.0, 'r_annual': 0.03, 'n_months': 120})[1:]):
+        for values in result:
+            with pytest.raises(ValueError):
+                values[..., 0] = 0.0
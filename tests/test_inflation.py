@@ -0,0 +1,18 @@
+import numpy as np
+
+import inflation
+
+
+def test_only_shared_grids_are_cached():
+    tables = inflation.DiscountTables()
+    times = np.linspace(0, 10, 121)
+    first = inflation.deflate(np.ones((3, times.size)), times, [0.04], tables=tables)
+    again = inflation.deflate(np.ones((3, times.size)), times, [0.04], tables=tables)
+    assert (tables.misses, tables.hits) == (1, 1)
+    np.testing.assert_array_equal(first['real_0.04'], again['real_0.04'])
+
+    horizons = np.random.default_rng(0).uniform(5, 40, 10000)
+    per_household = inflation.deflate(np.ones_like(horizons), horizons, [0.04], tables=tables,
+                                      grid=False)
+    assert len(tables.entries) == 1
+    np.testing.assert_allclose(per_household['real_0.04'], 1.04 ** -horizons)
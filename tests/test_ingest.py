@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+import ingest
+from expenses import CATEGORY_COL, INCOME, MAX_COL, MIN_COL
+
+
+def test_chunked_totals_match_a_single_groupby(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame({
+        ingest.HOUSEHOLD_COL: rng.integers(0, 37, n),
+        CATEGORY_COL: rng.choice(['Comida', 'Transporte', INCOME, INCOME.upper()], n),
+        MIN_COL: rng.uniform(0, 100, n).round(2),
+    })
+    df[MAX_COL] = df[MIN_COL] + rng.uniform(0, 50, n).round(2)
+    path = tmp_path / 'planillas.csv'
+    df.to_csv(path, index=False)
+
+    totals = ingest.household_totals(str(path), chunksize=64).set_index(ingest.HOUSEHOLD_COL)
+
+    is_income = df[CATEGORY_COL].str.lower() == INCOME.lower()
+    expected = pd.DataFrame({
+        ingest.HOUSEHOLD_COL: df[ingest.HOUSEHOLD_COL],
+        'income': df[MIN_COL].where(is_income, 0.0),
+        'total_min_expense': df[MIN_COL].where(~is_income, 0.0),
+        'total_max_expense': df[MAX_COL].where(~is_income, 0.0),
+    }).groupby(ingest.HOUSEHOLD_COL).sum()
+    assert len(totals) == len(expected) and is_income.sum() > 0
+    totals = totals.loc[expected.index]
+    for column in expected:
+        np.testing.assert_allclose(totals[column], expected[column], rtol=1e-12)
+    np.testing.assert_allclose(totals['max_savings'],
+                               expected['income'] - expected['total_min_expense'], rtol=1e-12)
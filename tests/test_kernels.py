@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import kernels
+
+
+def _run(block, n=64, n_steps=500, dt=0.01):
+    rng = np.random.default_rng(0)
+    g, c1, c2, r = (rng.uniform(lo, hi, n) for lo, hi in
+                    ((0, 0.08), (0.7, 0.95), (0, 0.2), (0, 0.06)))
+    c0 = rng.uniform(0, 100, n)
+    A = rng.uniform(0, 500, n)
+    I_start = rng.uniform(1500, 3000, n)
+    A_out = np.empty((n, n_steps + 1))
+    I_out = np.empty_like(A_out)
+    # Two blocks, as simulate_rk4 does between progress reports
+    for start, stop in ((1, n_steps // 2), (n_steps // 2, n_steps + 1)):
+        block(A, I_start, np.exp(g * dt / 2), np.exp(g * dt), 1 - c1, c0, c2 + r, dt,
+              A_out, I_out, start, stop)
+    return A_out[:, 1:], I_out[:, 1:], A, I_start
+
+
+def test_numba_kernel_matches_numpy_bit_for_bit():
+    compiled = kernels.numba_kernel()
+    if compiled is None:
+        pytest.skip('Numba no está instalado')
+    for expected, actual in zip(_run(kernels.rk4_block_numpy), _run(compiled)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_importing_edo_does_not_import_numba():
+    code = 'import sys, edo; print("numba" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(kernels.__file__))
+    assert out.stdout.strip() == 'False'
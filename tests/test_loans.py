@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import loans
+
+
+def test_payment_pays_off_the_loan():
+    principal, rate, months = np.array([10000.0, 5000.0]), np.array([0.12, 0.0]), np.array([24, 10])
+    np.testing.assert_allclose(loans.balance(principal, rate, months, months), 0.0, atol=1e-6)
+    np.testing.assert_allclose(loans.payment(5000.0, 0.0, 10), 500.0)
+
+
+def test_non_positive_terms_are_rejected():
+    df = pd.DataFrame({'capital': [1000.0, 2000.0, 3000.0], 'tasa': [0.1, 0.1, 0.1],
+                       'plazo': [12, 0, -3]})
+    with pytest.raises(ValueError, match='filas: 2, 3'):
+        loans.from_table(df)
@@ -0,0 +1,42 @@
+import numpy as np
+
+import montecarlo
+
+
+def test_fan_widens_for_later_chunks():
+    # The second chunk lies far outside the range set by the first one
+    rng = np.random.default_rng(0)
+    first = rng.normal(0.0, 1.0, (20000, 2))
+    later = rng.normal(0.0, 5.0, (20000, 2)) + np.array([10.0, -10.0])
+    fan = montecarlo._FanAccumulator()
+    fan.add(first)
+    fan.add(later)
+    assert (fan.counts.sum(axis=1) == 40000).all()
+    values = np.vstack([first, later])
+    for q in (1, 50, 99):
+        np.testing.assert_allclose(fan.percentile(q), np.percentile(values, q, axis=0), atol=0.05)
+    np.testing.assert_allclose(fan.mean(), values.mean(axis=0))
+
+
+def test_fan_counts_nonfinite_values_apart():
+    # inf/NaN in the first and in a later chunk; the last column never
+    # gets a finite value
+    rng = np.random.default_rng(1)
+    first = rng.normal(0.0, 1.0, (1000, 3))
+    first[:10, 0] = np.inf
+    first[:, 2] = np.nan
+    later = rng.normal(3.0, 1.0, (1000, 3))
+    later[:5, 1] = -np.inf
+    later[5:7, 0] = np.nan
+    later[:, 2] = np.inf
+    fan = montecarlo._FanAccumulator()
+    fan.add(first)
+    fan.add(later)
+    np.testing.assert_array_equal(fan.nonfinite, [12, 5, 2000])
+    np.testing.assert_array_equal(fan.total, [1988, 1995, 0])
+    values = np.vstack([first, later])
+    for col in (0, 1):
+        finite = values[np.isfinite(values[:, col]), col]
+        assert abs(fan.percentile(50)[col] - np.median(finite)) < 0.05
+        assert np.isclose(fan.mean()[col], finite.mean())
+    assert np.isnan(fan.percentile(50)[2]) and np.isnan(fan.mean()[2])
@@ -0,0 +1,41 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import scenarios
+
+MINS = np.array([100.0, 250.0, 40.0, 80.0, 300.0])
+MAXS = np.array([150.0, 400.0, 90.0, 80.0, 500.0])
+INCOME = 1200.0
+
+
+@pytest.mark.parametrize('levels', [2, 3])
+def test_full_grid_matches_brute_force(levels):
+    grid = [np.linspace(lo, hi, levels) for lo, hi in zip(MINS, MAXS)]
+    savings = np.array([INCOME - sum(c) for c in itertools.product(*grid)])
+    result = scenarios.run(MINS, MAXS, INCOME, levels=levels, n_bins=10**5, chunk_size=7)
+    assert result['n_scenarios'] == levels ** MINS.size and not result['sampled']
+    assert result['counts'].sum() == savings.size
+    assert np.isclose(result['mean'], savings.mean())
+    assert np.isclose(result['std'], savings.std())
+    assert result['p_deficit'] == np.mean(savings < 0)
+
+
+def test_large_grids_are_sampled():
+    # 2^70 scenarios: neither enumerated nor numbered with int64
+    rng = np.random.default_rng(0)
+    mins = rng.uniform(0, 100, 70)
+    maxs = mins + rng.uniform(0, 50, 70)
+    result = scenarios.run(mins, maxs, 10000.0, seed=0, chunk_size=2**16)
+    assert result['sampled'] and result['n_scenarios'] == scenarios.FALLBACK_SAMPLES
+    expected = 10000.0 - (mins + maxs).sum() / 2
+    assert abs(result['mean'] - expected) < 1.0
+    with pytest.raises(ValueError):
+        scenarios.scenario_block(mins, maxs, 10000.0, 0, 10)
+
+
+def test_cap_switches_to_sampling():
+    result = scenarios.run(MINS, MAXS, INCOME, max_scenarios=16, seed=0)
+    assert result['sampled'] and result['n_scenarios'] == scenarios.FALLBACK_SAMPLES
+    assert not scenarios.run(MINS, MAXS, INCOME, max_scenarios=32)['sampled']
@@ -0,0 +1,51 @@
+import numpy as np
+
+import edo
+import schedules
+
+PARAMS = (2061.0, 0.05, 50.0, 0.9, 0.1, 0.03, 161.0)
+
+
+def test_constant_income_series_matches_edo():
+    # Constant income (g = 0): the exact per-step solution is the analytic one
+    I0, _, c0, c1, c2, r, A0 = PARAMS
+    series = {schedules.INCOME_COL: np.ones(240)}
+    _, A, I, _ = schedules.solve(I0, 0.0, c0, c1, c2, r, A0, 10, series)
+    _, A_ref, I_ref, _ = edo.solve(I0, 0.0, c0, c1, c2, r, A0, 10, dt=schedules.MONTH)
+    np.testing.assert_allclose(A, A_ref, rtol=1e-9)
+    np.testing.assert_allclose(I, I_ref, rtol=1e-12)
+
+
+def test_constant_rate_series_matches_edo():
+    series = {schedules.RATE_COL: np.full(240, PARAMS[5])}
+    _, A, _, _ = schedules.solve(*PARAMS, 10, series)
+    _, A_ref, _, _ = edo.solve(*PARAMS, 10, dt=schedules.MONTH)
+    np.testing.assert_allclose(A, A_ref, rtol=1e-5)
+
+
+def test_growth_income_series_matches_edo():
+    # Monthly levels following e^(g t): only the piecewise-constant income differs
+    g = PARAMS[1]
+    series = {schedules.INCOME_COL: np.exp(g * np.arange(240) * schedules.MONTH)}
+    _, A, _, _ = schedules.solve(*PARAMS, 10, series)
+    _, A_ref, _, _ = edo.solve(*PARAMS, 10, dt=schedules.MONTH)
+    np.testing.assert_allclose(A[:, -1], A_ref[:, -1], rtol=5e-3)
+
+
+def test_vf_trajectory_flat_rate_matches_annuity():
+    import annuity
+
+    _, values = schedules.vf_trajectory([161.0, 300.0], [0.03], 120)
+    _, expected = annuity.trajectory(np.array([161.0, 300.0]), 0.03, 120)
+    np.testing.assert_allclose(values, expected, rtol=1e-12)
+
+
+def test_grid_ends_at_T_when_not_a_multiple_of_dt():
+    # Same grid as edo.solve: it stops at T instead of rounding past it
+    series = {schedules.RATE_COL: np.full(240, PARAMS[5])}
+    for T in (2.95, 9.75):
+        times, A, _, _ = schedules.solve(*PARAMS, T, series, dt=0.1)
+        times_ref, A_ref, _, _ = edo.solve(*PARAMS, T, dt=0.1)
+        assert times[-1] == T
+        np.testing.assert_array_equal(times, times_ref)
+        np.testing.assert_allclose(A, A_ref, rtol=1e-5)
@@ -0,0 +1,17 @@
+import os
+
+import pandas as pd
+import pytest
+
+import storage
+
+
+def test_parquet_without_pyarrow_warns_and_reports_npz(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'pyarrow', None)
+    df = pd.DataFrame({'Categoría': ['Ingreso', 'Otros'], 'Gasto Mín (Bs.)': [2061.0, 50.0]})
+    with pytest.warns(UserWarning, match='pyarrow'):
+        saved = storage.save_table(df, str(tmp_path / 'planilla.parquet'))
+    assert saved == str(tmp_path / 'planilla.npz') and os.path.exists(saved)
+    with pytest.warns(UserWarning):
+        loaded = storage.load_table(str(tmp_path / 'planilla.parquet'))
+    pd.testing.assert_frame_equal(loaded, df, check_dtype=False)
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+import pytest
+
+import sweep
+
+BASE = {'I0': 2061.0, 'g': 0.05, 'c0': 50.0, 'c1': 0.9, 'c2': 0.1, 'r': 0.03, 'A0': 161.0, 'T': 10}
+RANGES = {'c1': [0.7, 0.8, 0.9], 'r': [0.01, 0.02, 0.03, 0.04, 0.05]}
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupted_sweep_resumes_to_the_serial_result(tmp_path):
+    serial = sweep.run_sweep(RANGES, BASE, str(tmp_path / 'serial'), max_workers=1, chunk_size=15)
+
+    def interrupt(done, total):
+        raise Interrupted
+
+    out_dir = tmp_path / 'parallel'
+    with pytest.raises(Interrupted):
+        sweep.run_sweep(RANGES, BASE, str(out_dir), chunk_size=4, max_workers=2, progress=interrupt)
+    # Drop some finished chunks, as if the run had been killed before them
+    os.remove(sweep._chunk_path(str(out_dir), 1))
+    os.remove(sweep._chunk_path(str(out_dir), 3))
+    assert not (out_dir / sweep.TABLE).exists()
+
+    calls = []
+    table = sweep.run_sweep(RANGES, BASE, str(out_dir), chunk_size=4, max_workers=2,
+                            progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(3, 4), (4, 4)]
+    pd.testing.assert_frame_equal(pd.read_csv(table), pd.read_csv(serial))
+
+
+def test_resume_rejects_another_configuration(tmp_path):
+    sweep.run_sweep(RANGES, BASE, str(tmp_path), chunk_size=8, max_workers=2)
+    with pytest.raises(ValueError):
+        sweep.run_sweep(RANGES, dict(BASE, T=20), str(tmp_path), chunk_size=8, max_workers=2)